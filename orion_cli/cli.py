@@ -20,15 +20,15 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from importlib.metadata import version as get_version
 from pathlib import Path
 from typing import Optional, Union
 import click
-from orion_cli.services.display_service import DisplayService
 from orion_cli.services.log_service import logger
 from typing import Optional
-import pkg_resources
 
-version = pkg_resources.get_distribution("orion_cli").version
+# services are imported inside the commands so the CAD stack is only loaded by the commands that need it
+version = get_version("orion_cli")
 
 logo = """
   ____      _             _______   ____
@@ -51,7 +51,9 @@ def cli():
 @click.option("--cad-path", help="The path for a step file (CAD/3D) to be processed with the tool", type=click.Path(), required=False)
 @click.option("--remote-url", help="The URL of the remote repository", required=False, default=None)
 @click.option("--include-assets", help="Include assets in the project", is_flag=True, default=False)
-def create_command(name: str, cad_path: str, remote_url: Optional[str], include_assets: bool):
+@click.option("--workers", help="Number of worker processes for reading the CAD file, 0 uses all cores", type=int, default=1)
+@click.option("--thumbnail-format", help="Format of the asset thumbnails", type=click.Choice(["svg", "png"]), default="svg")
+def create_command(name: str, cad_path: str, remote_url: Optional[str], include_assets: bool, workers: int, thumbnail_format: str):
     """Create a new project"""
     from pathlib import Path
     from orion_cli.services.create_service import CreateService
@@ -98,7 +100,7 @@ def create_command(name: str, cad_path: str, remote_url: Optional[str], include_
     # Create the project
     service = CreateService()
     # try:
-    service.create(name, project_path, cad_path, remote_url, include_assets)
+    service.create(name, project_path, cad_path, remote_url, include_assets, workers, thumbnail_format)
     logger.info(f"Project '{name}' has been created/updated at {project_path / name}")
     logger.info(f"Original CAD file: {cad_path}")
     logger.info(f"CAD file has been copied in the project directory.")
@@ -141,9 +143,11 @@ def revision_command(project_path: Union[str, Path], cad_path: str):
 
 @cli.command(name="display")
 @click.option("--project-path", type=click.Path(exists=True),help="The path of the project to be revised", required=False)
-def display_command(project_path: Union[str, Path]):
+@click.option("--workers", help="Number of worker processes for loading parts, 0 uses all cores, defaults to the project config", type=int, required=False)
+@click.option("--lod/--no-lod", help="Use coarser meshes for parts that are small relative to the assembly", default=True)
+def display_command(project_path: Union[str, Path], workers: Optional[int], lod: bool):
     """Display the CAD file as three.js html file"""
-    from orion_cli.services.revision_service import RevisionService
+    from orion_cli.services.display_service import DisplayService
     from pathlib import Path
     from orion_cli.helpers.config_helper import ConfigHelper
 
@@ -154,8 +158,60 @@ def display_command(project_path: Union[str, Path]):
         click.echo("You can create a project using 'orion create' or provide a valid project path.")
         return
 
+    # Load the configuration
+    config = ConfigHelper.load_config(config_path)
+    if workers is not None:
+        config.options.workers = workers
+
     service = DisplayService()
-    service.display(project_path)
+    service.display(project_path, config.options.num_workers, lod)
+
+
+@cli.command(name="export")
+@click.option("--project-path", type=click.Path(exists=True), help="The path of the project to be exported", required=False)
+@click.option("--format", "export_format", type=click.Choice(["glb"]), help="The format of the exported file", default="glb")
+@click.option("--output", type=click.Path(), help="The exported file path, defaults to <project name>.<format> in the project directory", required=False)
+@click.option("--workers", help="Number of worker processes for tessellating parts, 0 uses all cores, defaults to the project config", type=int, required=False)
+@click.option("--lod/--no-lod", help="Use coarser meshes for parts that are small relative to the assembly", default=True)
+def export_command(project_path: Union[str, Path], export_format: str, output: Optional[str], workers: Optional[int], lod: bool):
+    """Export the project assembly with instanced part meshes"""
+    from orion_cli.services.export_service import ExportService
+    from pathlib import Path
+    from orion_cli.helpers.config_helper import ConfigHelper
+
+    project_path = Path.cwd() if not project_path else Path(project_path)
+    config_path = project_path / "config.yaml"
+    if not config_path.exists():
+        click.echo("No config.yaml found in the project directory.")
+        click.echo("You can create a project using 'orion create' or provide a valid project path.")
+        return
+
+    config = ConfigHelper.load_config(config_path)
+    if workers is not None:
+        config.options.workers = workers
+
+    service = ExportService()
+    service.export(project_path, export_format, output, config.options.num_workers, lod)
+
+
+@cli.command(name="migrate")
+@click.option("--project-path", type=click.Path(exists=True), help="The path of the project to be migrated", required=False)
+@click.option("--part-format", type=click.Choice(["text", "binary"]), help="The BREP format of the inventory part files", required=True)
+@click.option("--compress/--no-compress", help="Gzip compress the inventory part files", default=None)
+def migrate_command(project_path: Union[str, Path], part_format: str, compress: Optional[bool]):
+    """Rewrite the inventory parts in a new storage format"""
+    from orion_cli.services.migrate_service import MigrateService
+    from pathlib import Path
+
+    project_path = Path.cwd() if not project_path else Path(project_path)
+    config_path = project_path / "config.yaml"
+    if not config_path.exists():
+        click.echo("No config.yaml found in the project directory.")
+        click.echo("You can create a project using 'orion create' or provide a valid project path.")
+        return
+
+    service = MigrateService()
+    service.migrate(project_path, part_format, compress)
 
 
 @cli.command(name="deploy")
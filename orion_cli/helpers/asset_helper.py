@@ -20,15 +20,26 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Optional, Union
+import hashlib
+import io
+import math
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Literal, Optional, TextIO, Union
+import numpy as np
 import cadquery as cq
 from pydantic import BaseModel
 from OCP.gp import gp_Ax2
 from OCP.BRepLib import BRepLib
-from OCP.HLRBRep import HLRBRep_Algo, HLRBRep_HLRToShape
+from OCP.HLRBRep import HLRBRep_Algo, HLRBRep_HLRToShape, HLRBRep_PolyAlgo, HLRBRep_PolyHLRToShape
+from OCP.BRepMesh import BRepMesh_IncrementalMesh
 from OCP.HLRAlgo import HLRAlgo_Projector
 from cadquery.occ_impl.shapes import TOLERANCE
-from cadquery.occ_impl.exporters.svg import PATHTEMPLATE, getPaths, guessUnitOfMeasure, AXES_TEMPLATE
+from cadquery.occ_impl.exporters.svg import PATHTEMPLATE, DISCRETIZATION_TOLERANCE, guessUnitOfMeasure, AXES_TEMPLATE
+from OCP.GCPnts import GCPnts_QuasiUniformDeflection
+from orion_cli.helpers.cad_helper import CadHelper
 
 SVG_TEMPLATE = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
 <svg
@@ -64,6 +75,9 @@ SVG_TEMPLATE = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
 </svg>
 """
 
+# bump when the rendering changes so cached SVGs are regenerated
+SVG_RENDERER_VERSION = 2
+
 class SVGOptions(BaseModel):
      width: int = 800
      height: int = 240
@@ -76,8 +90,329 @@ class SVGOptions(BaseModel):
      hiddenColor: tuple = (160, 160, 160)
      showHidden: bool = True
      focus: Optional[float] = None
+     # exact uses HLRBRep_Algo, poly removes hidden lines on a tessellation which is much faster for large shapes
+     # and auto picks poly when the shape has more than autoFaceLimit faces
+     hlrMode: Literal["exact", "poly", "auto"] = "exact"
+     # linear deflection of the tessellation used by poly, defaults to a fraction of the bounding box diagonal
+     deflection: Optional[float] = None
+     angularDeflection: float = 0.5
+     autoFaceLimit: int = 2000
+     # decimals of a pixel kept in the path coordinates, full precision when None
+     precision: Optional[int] = None
+     # Douglas-Peucker tolerance in pixels used to simplify the paths
+     simplifyTolerance: Optional[float] = None
+
+# bump when the rasterizer changes so cached PNGs are regenerated
+PNG_RENDERER_VERSION = 2
+
+class PNGOptions(BaseModel):
+     width: int = 800
+     height: int = 240
+     # fraction of the image the shape is fitted to
+     fill: float = 0.9
+     # color of shapes and of assembly parts without their own color
+     color: tuple = (150, 165, 190)
+     ambient: float = 0.35
+     # samples per pixel along each axis, used for anti aliasing
+     supersampling: int = 2
 
 class AssetHelper:
+     @staticmethod
+     def get_asset_cache_key(checksum: str, opts: Union[SVGOptions, PNGOptions]):
+          """
+          Cache key of the asset rendered for a shape checksum with the given options and the current renderer version.
+          """
+          version = PNG_RENDERER_VERSION if isinstance(opts, PNGOptions) else SVG_RENDERER_VERSION
+          key = f"{checksum}:{type(opts).__name__}:{opts.model_dump_json()}:{version}"
+          return hashlib.md5(key.encode()).hexdigest()
+
+     @staticmethod
+     def exportAsset_brep(data: Union[bytes, Path], file_path: Union[Path, str], opts: Union[SVGOptions, PNGOptions]):
+          """
+          Export a shape serialized as binary BREP or stored in a BREP file to an SVG or PNG file, used to render in worker processes.
+          """
+          shape = CadHelper.import_brep_bytes(data) if isinstance(data, bytes) else CadHelper.import_brep(data)
+          AssetHelper.exportAsset(cq.Shape.cast(shape), file_path, opts)
+
+     @staticmethod
+     def exportAsset(shape: Union[cq.Shape, cq.Assembly], file_path: Union[Path, str], opts: Union[SVGOptions, PNGOptions]):
+          """
+          Export a shape to an SVG or PNG file depending on the type of the options.
+          """
+          if isinstance(opts, PNGOptions):
+                AssetHelper.exportPNG(shape, file_path, opts)
+          else:
+                AssetHelper.exportSVG(shape, file_path, opts)
+
+     @staticmethod
+     def exportPNG(shape: Union[cq.Shape, cq.Assembly], file_path: Union[Path, str], opts: Optional[PNGOptions] = None):
+          """
+          Export a shaded thumbnail of a shape to a PNG file, written through a temporary file like exportSVG.
+          """
+          file_path = Path(file_path)
+          tmp_path = file_path.with_suffix(".tmp")
+          tmp_path.write_bytes(AssetHelper.getPNG(shape, opts))
+          os.replace(tmp_path, file_path)
+
+     @staticmethod
+     def getPNG(shape: Union[cq.Shape, cq.Assembly], opts: Optional[PNGOptions] = None):
+          """
+          Render a shaded thumbnail of a shape to PNG bytes.
+
+          The shape is tessellated and rasterized with a z-buffer in NumPy from the same view direction as the SVGs,
+          so no GPU or display is needed.
+          """
+          d = opts or PNGOptions()
+          ss = max(1, d.supersampling)
+          width, height = d.width * ss, d.height * ss
+
+          # assembly parts are tessellated one at a time so every triangle keeps the color of its part
+          colored_shapes = [(shape, d.color)] if isinstance(shape, cq.Shape) else AssetHelper.getColoredShapes(shape, d.color)
+          vertices_list, triangles_list, colors_list = [], [], []
+          offset = 0
+          for part_shape, part_color in colored_shapes:
+                mesh = CadHelper.tesselate_shape(part_shape)
+                part_vertices = np.asarray(mesh.vertices, dtype=np.float64).reshape(-1, 3)
+                part_triangles = np.asarray(mesh.simplices, dtype=np.int64).reshape(-1, 3)
+                vertices_list.append(part_vertices)
+                triangles_list.append(part_triangles + offset)
+                colors_list.append(np.tile(np.asarray(part_color[:3], dtype=np.float64), (len(part_triangles), 1)))
+                offset += len(part_vertices)
+          vertices = np.concatenate(vertices_list) if vertices_list else np.zeros((0, 3))
+          triangles = np.concatenate(triangles_list) if triangles_list else np.zeros((0, 3), dtype=np.int64)
+          triangle_colors = np.concatenate(colors_list) if colors_list else np.zeros((0, 3))
+
+          # same view as the SVGs, the view direction points towards the viewer
+          view_dir = np.array([1.0, -1.0, 1.0]) / np.sqrt(3)
+          view_x = np.cross([0.0, 0.0, 1.0], view_dir)
+          view_x /= np.linalg.norm(view_x)
+          view_y = np.cross(view_dir, view_x)
+          projected = vertices @ np.stack([view_x, view_y, view_dir], axis=1)
+
+          rgba = np.zeros((height, width, 4), dtype=np.float64)
+          if len(triangles):
+                mins, maxs = projected[:, :2].min(axis=0), projected[:, :2].max(axis=0)
+                extent = np.maximum(maxs - mins, 1e-12)
+                scale = min(width * d.fill / extent[0], height * d.fill / extent[1])
+                center = (mins + maxs) / 2
+                pixels = np.empty((len(projected), 2))
+                pixels[:, 0] = (projected[:, 0] - center[0]) * scale + width / 2
+                pixels[:, 1] = height / 2 - (projected[:, 1] - center[1]) * scale
+
+                triangle_ids, zbuffer = AssetHelper.rasterize(pixels, projected[:, 2], triangles, width, height)
+
+                # two sided lambert shading with a light slightly above and left of the viewer
+                corners = vertices[triangles]
+                normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+                normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-300)
+                light = view_dir + 0.4 * view_y - 0.3 * view_x
+                light /= np.linalg.norm(light)
+                intensity = d.ambient + (1 - d.ambient) * np.abs(normals @ light)
+
+                covered = triangle_ids >= 0
+                rgba[covered, :3] = intensity[triangle_ids[covered], None] * triangle_colors[triangle_ids[covered]]
+                rgba[covered, 3] = 255
+
+          # average the samples, colors are premultiplied by alpha so the edges blend into the background
+          rgba[..., :3] *= rgba[..., 3:] / 255
+          rgba = rgba.reshape(d.height, ss, d.width, ss, 4).mean(axis=(1, 3))
+          alpha = rgba[..., 3:]
+          rgba[..., :3] = np.divide(rgba[..., :3] * 255, alpha, out=np.zeros_like(rgba[..., :3]), where=alpha > 0)
+          return AssetHelper.encodePNG(np.clip(np.round(rgba), 0, 255).astype(np.uint8))
+
+     @staticmethod
+     def getColoredShapes(assembly: cq.Assembly, color: tuple, loc: Optional[cq.Location] = None):
+          """
+          Shapes of an assembly and its children placed in the assembly frame, with their 0-255 RGB colors.
+          Parts without a color inherit the one of their parent assembly or the given default.
+          """
+          loc = assembly.loc if loc is None else loc * assembly.loc
+          if assembly.color is not None:
+                color = tuple(round(c * 255) for c in assembly.color.toTuple()[:3])
+          colored_shapes = [(shape.moved(loc), color) for shape in assembly.shapes]
+          for child in assembly.children:
+                colored_shapes += AssetHelper.getColoredShapes(child, color, loc)
+          return colored_shapes
+
+     @staticmethod
+     def rasterize(pixels: np.ndarray, depths: np.ndarray, triangles: np.ndarray, width: int, height: int, max_fragments: int = 1 << 22):
+          """
+          Z-buffer rasterization of triangles given in pixel coordinates, larger depths are closer to the viewer.
+          Returns the index of the visible triangle of every pixel (-1 when empty) and the depth buffer.
+
+          Every triangle is split into the horizontal spans of pixel centers it covers and the spans into
+          fragments, so the work is proportional to the covered pixels.
+          """
+          triangle_ids = np.full(width * height, -1, dtype=np.int64)
+          zbuffer = np.full(width * height, -np.inf)
+
+          corners = pixels[triangles]
+          corner_depths = depths[triangles]
+          edge1, edge2 = corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+          areas = edge1[:, 0] * edge2[:, 1] - edge1[:, 1] * edge2[:, 0]
+
+          # rows of pixel centers covered by the bounding box of each triangle
+          first_row = np.clip(np.ceil(corners[:, :, 1].min(axis=1) - 0.5), 0, height).astype(np.int64)
+          last_row = np.clip(np.floor(corners[:, :, 1].max(axis=1) - 0.5) + 1, 0, height).astype(np.int64)
+          num_rows = np.where(np.abs(areas) > 1e-12, np.maximum(last_row - first_row, 0), 0)
+
+          # depth plane of each triangle, z = z0 + dzdx * (x - x0) + dzdy * (y - y0)
+          safe_areas = np.where(areas == 0, 1, areas)
+          dz1, dz2 = corner_depths[:, 1] - corner_depths[:, 0], corner_depths[:, 2] - corner_depths[:, 0]
+          dzdx = (dz1 * edge2[:, 1] - dz2 * edge1[:, 1]) / safe_areas
+          dzdy = (dz2 * edge1[:, 0] - dz1 * edge2[:, 0]) / safe_areas
+
+          # chunk the triangles by their bounding box area which bounds the number of fragments
+          box_areas = num_rows * (np.ptp(corners[:, :, 0], axis=1) + 2)
+          cumulative_areas = np.cumsum(box_areas)
+          chunk_ends = np.searchsorted(cumulative_areas, np.arange(1, cumulative_areas[-1] // max_fragments + 1) * max_fragments, side="right")
+          boundaries = np.unique(np.concatenate([[0], chunk_ends, [len(triangles)]]))
+          for chunk_start, chunk_end in zip(boundaries[:-1], boundaries[1:]):
+                ids = np.arange(chunk_start, chunk_end)
+                ids = ids[num_rows[ids] > 0]
+                if not len(ids):
+                     continue
+
+                # spans, one per covered row of every triangle
+                row_ids = np.repeat(ids, num_rows[ids])
+                rows = first_row[row_ids] + np.arange(len(row_ids)) - np.repeat(np.cumsum(num_rows[ids]) - num_rows[ids], num_rows[ids])
+                centers_y = rows + 0.5
+                span_left = np.full(len(row_ids), np.inf)
+                span_right = np.full(len(row_ids), -np.inf)
+                for a, b in ((0, 1), (1, 2), (2, 0)):
+                     xa, ya = corners[row_ids, a, 0], corners[row_ids, a, 1]
+                     xb, yb = corners[row_ids, b, 0], corners[row_ids, b, 1]
+                     crosses = (np.minimum(ya, yb) <= centers_y) & (centers_y <= np.maximum(ya, yb)) & (ya != yb)
+                     x = xa + (centers_y - ya) * (xb - xa) / np.where(ya == yb, 1, yb - ya)
+                     span_left = np.where(crosses, np.minimum(span_left, x), span_left)
+                     span_right = np.where(crosses, np.maximum(span_right, x), span_right)
+                span_start = np.clip(np.ceil(span_left - 0.5), 0, width).astype(np.int64)
+                span_end = np.clip(np.floor(span_right - 0.5) + 1, 0, width).astype(np.int64)
+                span_lengths = np.maximum(span_end - span_start, 0)
+
+                # fragments, one per pixel center inside a span
+                fragment_spans = np.repeat(np.arange(len(row_ids)), span_lengths)
+                columns = span_start[fragment_spans] + np.arange(len(fragment_spans)) - np.repeat(np.cumsum(span_lengths) - span_lengths, span_lengths)
+                fragment_rows = rows[fragment_spans]
+                fragment_ids = row_ids[fragment_spans]
+                fragment_depths = (
+                     corner_depths[fragment_ids, 0]
+                     + dzdx[fragment_ids] * (columns + 0.5 - corners[fragment_ids, 0, 0])
+                     + dzdy[fragment_ids] * (fragment_rows + 0.5 - corners[fragment_ids, 0, 1])
+                )
+                fragment_pixels = fragment_rows * width + columns
+
+                # keep the closest fragment of each pixel, then merge with the buffer
+                order = np.lexsort((-fragment_depths, fragment_pixels))
+                fragment_pixels, first = np.unique(fragment_pixels[order], return_index=True)
+                closest = order[first]
+                closer = fragment_depths[closest] > zbuffer[fragment_pixels]
+                zbuffer[fragment_pixels[closer]] = fragment_depths[closest][closer]
+                triangle_ids[fragment_pixels[closer]] = fragment_ids[closest][closer]
+
+          return triangle_ids.reshape(height, width), zbuffer.reshape(height, width)
+
+     @staticmethod
+     def encodePNG(rgba: np.ndarray):
+          """
+          Encode an (H, W, 4) uint8 RGBA image as PNG bytes.
+          """
+          height, width = rgba.shape[:2]
+
+          def chunk(tag: bytes, data: bytes):
+                return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+          # every scanline starts with filter type 0
+          scanlines = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, -1)], axis=1)
+          return (
+                b"\x89PNG\r\n\x1a\n"
+                + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+                + chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 9))
+                + chunk(b"IEND", b"")
+          )
+
+     @staticmethod
+     def getExactHLRShapes(shape: cq.Shape, projector: HLRAlgo_Projector):
+          """
+          Visible and hidden edges of a shape from the exact hidden line removal.
+          """
+          hlr = HLRBRep_Algo()
+          hlr.Add(shape.wrapped)
+
+          hlr.Projector(projector)
+          hlr.Update()
+          hlr.Hide()
+
+          hlr_shapes = HLRBRep_HLRToShape(hlr)
+
+          visible = []
+
+          visible_sharp_edges = hlr_shapes.VCompound()
+          if not visible_sharp_edges.IsNull():
+                visible.append(visible_sharp_edges)
+
+          visible_smooth_edges = hlr_shapes.Rg1LineVCompound()
+          if not visible_smooth_edges.IsNull():
+                visible.append(visible_smooth_edges)
+
+          visible_contour_edges = hlr_shapes.OutLineVCompound()
+          if not visible_contour_edges.IsNull():
+                visible.append(visible_contour_edges)
+
+          hidden = []
+
+          hidden_sharp_edges = hlr_shapes.HCompound()
+          if not hidden_sharp_edges.IsNull():
+                hidden.append(hidden_sharp_edges)
+
+          hidden_contour_edges = hlr_shapes.OutLineHCompound()
+          if not hidden_contour_edges.IsNull():
+                hidden.append(hidden_contour_edges)
+
+          return visible, hidden
+
+     @staticmethod
+     def getPolyHLRShapes(shape: cq.Shape, projector: HLRAlgo_Projector, deflection: Optional[float] = None, angularDeflection: float = 0.5):
+          """
+          Visible and hidden edges of a shape from the polygonal hidden line removal on a tessellation of the shape.
+          """
+          # mesh a copy so the triangulation does not end up in exported part files
+          shape = shape.copy()
+          if deflection is None:
+                deflection = shape.BoundingBox().DiagonalLength * 1e-3
+          BRepMesh_IncrementalMesh(shape.wrapped, deflection, False, angularDeflection, True)
+
+          hlr = HLRBRep_PolyAlgo(shape.wrapped)
+          hlr.Projector(projector)
+          hlr.Update()
+
+          hlr_shapes = HLRBRep_PolyHLRToShape()
+          hlr_shapes.Update(hlr)
+
+          visible = []
+          for edges in (hlr_shapes.VCompound(), hlr_shapes.Rg1LineVCompound(), hlr_shapes.OutLineVCompound()):
+                if not edges.IsNull():
+                     visible.append(edges)
+
+          hidden = []
+          for edges in (hlr_shapes.HCompound(), hlr_shapes.OutLineHCompound()):
+                if not edges.IsNull():
+                     hidden.append(edges)
+
+          return visible, hidden
+
+     @staticmethod
+     def exportSVG(shape: Union[cq.Shape, cq.Assembly], file_path: Union[Path, str], opts: Optional[SVGOptions] = None):
+          """
+          Export a shape to an SVG file. The file is written through a temporary file so an interrupted
+          export never leaves a partial file behind.
+          """
+          file_path = Path(file_path)
+          tmp_path = file_path.with_suffix(".tmp")
+          with open(tmp_path, "w") as f:
+                AssetHelper.writeSVG(shape, f, opts)
+          os.replace(tmp_path, file_path)
+
      @staticmethod
      def getSVG(shape: Union[cq.Shape, cq.Assembly], opts: Optional[SVGOptions] = None):
           """
@@ -88,6 +423,73 @@ class AssetHelper:
           :param opts: An options object that influences the SVG that is output.
           :type opts: SVGOptions
           """
+          stream = io.StringIO()
+          AssetHelper.writeSVG(shape, stream, opts)
+          return stream.getvalue()
+
+     @staticmethod
+     def simplifyPolyline(points: np.ndarray, tolerance: float):
+          """
+          Douglas-Peucker simplification of an (N, 2) polyline, returns the points that are kept.
+          """
+          if len(points) <= 2 or tolerance <= 0:
+                return points
+          keep = np.zeros(len(points), dtype=bool)
+          keep[0] = keep[-1] = True
+          stack = [(0, len(points) - 1)]
+          while stack:
+                start, end = stack.pop()
+                if end - start < 2:
+                     continue
+                segment = points[end] - points[start]
+                offsets = points[start + 1:end] - points[start]
+                length = np.hypot(segment[0], segment[1])
+                if length > 0:
+                     distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+                else:
+                     distances = np.hypot(offsets[:, 0], offsets[:, 1])
+                index = int(np.argmax(distances))
+                if distances[index] > tolerance:
+                     index += start + 1
+                     keep[index] = True
+                     stack.append((start, index))
+                     stack.append((index, end))
+          return points[keep]
+
+     @staticmethod
+     def writePaths(f: TextIO, shapes: list[cq.Shape], decimals: Optional[int] = None, tolerance: Optional[float] = None):
+          """
+          Discretize the edges of the shapes and write them as SVG paths.
+          """
+          for shape in shapes:
+                for edge in shape.Edges():
+                     curve = edge._geomAdaptor()
+                     discretization = GCPnts_QuasiUniformDeflection(
+                          curve, DISCRETIZATION_TOLERANCE, curve.FirstParameter(), curve.LastParameter()
+                     )
+                     if not discretization.IsDone():
+                          f.write(PATHTEMPLATE % "")
+                          continue
+
+                     points = np.empty((discretization.NbPoints(), 2))
+                     for i in range(len(points)):
+                          point = discretization.Value(i + 1)
+                          points[i] = point.X(), point.Y()
+                     if tolerance:
+                          points = AssetHelper.simplifyPolyline(points, tolerance)
+                     if decimals is not None:
+                          # adding zero turns -0.0 into 0.0
+                          points = np.round(points, decimals) + 0.0
+
+                     coords = points.tolist()
+                     path = "M{},{} ".format(*coords[0]) + "".join("L{},{} ".format(x, y) for x, y in coords[1:])
+                     f.write(PATHTEMPLATE % path)
+
+     @staticmethod
+     def writeSVG(shape: Union[cq.Shape, cq.Assembly], f: TextIO, opts: Optional[SVGOptions] = None):
+          """
+          Export a shape as SVG to a text stream, paths are written as they are discretized.
+          """
           shape = shape if isinstance(shape, cq.Shape) else shape.toCompound()
           # Default options
           d = SVGOptions()
@@ -111,9 +513,6 @@ class AssetHelper:
           showHidden = d.showHidden
           focus = d.focus
 
-          hlr = HLRBRep_Algo()
-          hlr.Add(shape.wrapped)
-
           projection_origin = shape.Center()
           projection_dir = cq.Vector((1, -1, 1)).normalized()
           projection_x = cq.Vector((0, 0, 1)).normalized().cross(projection_dir)
@@ -126,35 +525,14 @@ class AssetHelper:
           else:
                 projector = HLRAlgo_Projector(coordinate_system)
 
-          hlr.Projector(projector)
-          hlr.Update()
-          hlr.Hide()
-
-          hlr_shapes = HLRBRep_HLRToShape(hlr)
-
-          visible = []
-
-          visible_sharp_edges = hlr_shapes.VCompound()
-          if not visible_sharp_edges.IsNull():
-                visible.append(visible_sharp_edges)
-
-          visible_smooth_edges = hlr_shapes.Rg1LineVCompound()
-          if not visible_smooth_edges.IsNull():
-                visible.append(visible_smooth_edges)
-
-          visible_contour_edges = hlr_shapes.OutLineVCompound()
-          if not visible_contour_edges.IsNull():
-                visible.append(visible_contour_edges)
+          hlrMode = d.hlrMode
+          if hlrMode == "auto":
+                hlrMode = "poly" if len(shape.Faces()) > d.autoFaceLimit else "exact"
 
-          hidden = []
-
-          hidden_sharp_edges = hlr_shapes.HCompound()
-          if not hidden_sharp_edges.IsNull():
-                hidden.append(hidden_sharp_edges)
-
-          hidden_contour_edges = hlr_shapes.OutLineHCompound()
-          if not hidden_contour_edges.IsNull():
-                hidden.append(hidden_contour_edges)
+          if hlrMode == "poly":
+                visible, hidden = AssetHelper.getPolyHLRShapes(shape, projector, d.deflection, d.angularDeflection)
+          else:
+                visible, hidden = AssetHelper.getExactHLRShapes(shape, projector)
 
           # Fix the underlying geometry - otherwise we will get segfaults
           for el in visible:
@@ -165,7 +543,6 @@ class AssetHelper:
           # convert to native CQ objects
           visible = list(map(cq.Shape, visible))
           hidden = list(map(cq.Shape, hidden))
-          (hiddenPaths, visiblePaths) = getPaths(visible, hidden)
 
           # get bounding box -- these are all in 2D space
           bb = cq.Compound.makeCompound(hidden + visible).BoundingBox()
@@ -197,17 +574,9 @@ class AssetHelper:
           if strokeWidth == -1.0:
                 strokeWidth = 1.0 / unitScale
 
-          # compute paths
-          hiddenContent = ""
-
-          # Prevent hidden paths from being added if the user disabled them
-          if showHidden:
-                for p in hiddenPaths:
-                     hiddenContent += PATHTEMPLATE % p
-
-          visibleContent = ""
-          for p in visiblePaths:
-                visibleContent += PATHTEMPLATE % p
+          # coordinates are rounded to the precision in pixels and simplified to the tolerance in pixels
+          decimals = max(0, math.ceil(d.precision + math.log10(unitScale))) if d.precision is not None else None
+          tolerance = d.simplifyTolerance / unitScale if d.simplifyTolerance else None
 
           # If the caller wants the axes indicator and is using the default direction, add in the indicator
           if showAxes and projectionDir == (-1.75, 1.1, 5):
@@ -217,22 +586,26 @@ class AssetHelper:
           else:
                 axesIndicator = ""
 
-          svg = SVG_TEMPLATE % (
-                {
-                     "unitScale": str(unitScale),
-                     "strokeWidth": str(strokeWidth),
-                     "strokeColor": ",".join([str(x) for x in strokeColor]),
-                     "hiddenColor": ",".join([str(x) for x in hiddenColor]),
-                     "hiddenContent": hiddenContent,
-                     "visibleContent": visibleContent,
-                     "xTranslate": str(xTranslate),
-                     "yTranslate": str(yTranslate),
-                     "width": str(width),
-                     "height": str(height),
-                     "textboxY": str(height - 30),
-                     "uom": str(uom),
-                     "axesIndicator": axesIndicator,
-                }
-          )
+          svg_values = {
+                "unitScale": str(unitScale),
+                "strokeWidth": str(strokeWidth),
+                "strokeColor": ",".join([str(x) for x in strokeColor]),
+                "hiddenColor": ",".join([str(x) for x in hiddenColor]),
+                "xTranslate": str(xTranslate),
+                "yTranslate": str(yTranslate),
+                "width": str(width),
+                "height": str(height),
+                "textboxY": str(height - 30),
+                "uom": str(uom),
+                "axesIndicator": axesIndicator,
+          }
+          svg_head, svg_rest = SVG_TEMPLATE.split("%(hiddenContent)s")
+          svg_middle, svg_tail = svg_rest.split("%(visibleContent)s")
 
-          return svg
+          f.write(svg_head % svg_values)
+          # Prevent hidden paths from being added if the user disabled them
+          if showHidden:
+                AssetHelper.writePaths(f, hidden, decimals, tolerance)
+          f.write(svg_middle % svg_values)
+          AssetHelper.writePaths(f, visible, decimals, tolerance)
+          f.write(svg_tail % svg_values)
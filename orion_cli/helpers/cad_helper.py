@@ -20,28 +20,46 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from collections.abc import Hashable, Mapping, MutableMapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass
+import tempfile
+import gzip
 import hashlib
+import io
+import json
+import os
 from pathlib import Path
-import pickle
+import shutil
+import time
 from typing import Iterable, Optional, Union, cast
-from cachetools import LRUCache
 import numpy as np
 from OCP.GProp import GProp_GProps
 from OCP.TopoDS import TopoDS_Shape, TopoDS_Vertex, TopoDS, TopoDS_Solid
+from OCP.TopLoc import TopLoc_Location
+from OCP.TopExp import TopExp
+from OCP.TopAbs import TopAbs_VERTEX
+from OCP.TopTools import TopTools_IndexedMapOfShape
 from OCP.BRepBuilderAPI import BRepBuilderAPI_Transform
 from OCP.gp import gp_Trsf
 from OCP.BRepTools import BRepTools
+from OCP.BinTools import BinTools
 from OCP.BRep import BRep_Builder, BRep_Tool
 import cadquery as cq
 from OCP.BRepGProp import BRepGProp
-from ocp_tessellate.tessellator import Tessellator, compute_quality, cache_size, get_size
+from ocp_tessellate.tessellator import Tessellator, compute_quality
 from ocp_tessellate.ocp_utils import bounding_box, get_location
 import cadquery as cq
 from ocp_tessellate.stepreader import StepReader
 
 RotationMatrixLike = Union[np.ndarray, list[list[float]]]
 VectorLike = Union[np.ndarray, list[float]]
+GZIP_MAGIC = b"\x1f\x8b"
+BINARY_BREP_HEADER = b"Open CASCADE Topology"
+ShapeKey = tuple[object, tuple[float, ...]]
+# size of the tessellation store on disk above which the least recently used meshes are removed
+TESSELLATION_STORE_MAX_BYTES = 1 << 30
 
 @dataclass
 class Mesh:
@@ -51,7 +69,137 @@ class Mesh:
     edges: np.ndarray
 
 
+class TessellationStore(MutableMapping):
+    """
+    Tessellation cache stored on disk with one directory per mesh, used in place of the in memory LRUCache
+    of the viewer. Keys are (part checksums, deviation, angular tolerance, ...) and values are dicts of arrays
+    which are saved as .npy files and memory mapped when read, so only the meshes that are used get loaded.
+    When the store grows over max_bytes the least recently used entries are removed, no limit when None.
+    """
+    def __init__(self, path: Union[Path, str], max_bytes: Optional[int] = TESSELLATION_STORE_MAX_BYTES):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # bytes on disk, counted on the first write
+        self.size: Optional[int] = None
+
+    def get_entry_path(self, key):
+        # entries are named by a hash of the whole key, the key itself is saved in key.json
+        return self.path / hashlib.md5(repr(key).encode()).hexdigest()
+
+    def get_entries(self):
+        return [entry_path for entry_path in self.path.iterdir() if entry_path.is_dir() and entry_path.suffix != ".tmp"]
+
+    @staticmethod
+    def get_entry_size(entry_path: Path):
+        return sum(file_path.stat().st_size for file_path in entry_path.iterdir())
+
+    def prune(self, keep: Optional[Path] = None):
+        """
+        Remove the least recently used entries until the store fits in max_bytes
+        """
+        if self.max_bytes is None:
+            return
+        entries = []
+        for entry_path in self.get_entries():
+            try:
+                entries.append((entry_path.stat().st_mtime_ns, entry_path, TessellationStore.get_entry_size(entry_path)))
+            except OSError:
+                # removed concurrently
+                continue
+        self.size = sum(size for _, _, size in entries)
+        for _, entry_path, size in sorted(entries):
+            if self.size <= self.max_bytes:
+                break
+            if entry_path != keep:
+                shutil.rmtree(entry_path, ignore_errors=True)
+                self.size -= size
+
+    def __getitem__(self, key):
+        entry_path = self.get_entry_path(key)
+        if not entry_path.is_dir():
+            raise KeyError(key)
+        try:
+            # the modification time of an entry is its last use
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return {array_path.stem: np.load(array_path, mmap_mode="r") for array_path in entry_path.glob("*.npy")}
+
+    def __setitem__(self, key, value: dict):
+        entry_path = self.get_entry_path(key)
+        if entry_path.is_dir():
+            return
+        arrays = {}
+        for name, array in value.items():
+            array = np.asarray(array)
+            # the caller skips caching on ValueError, like it does for values too large for an LRUCache
+            if array.dtype == object:
+                raise ValueError(f"Tessellation value '{name}' can not be stored as an array")
+            arrays[name] = array
+        try:
+            key_json = json.dumps(key)
+        except TypeError as e:
+            raise ValueError(f"Tessellation key {key!r} can not be stored as JSON") from e
+
+        # written to a temporary directory first so readers never see a partial entry
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir()
+        for name, array in arrays.items():
+            np.save(tmp_path / f"{name}.npy", array)
+        (tmp_path / "key.json").write_text(key_json)
+        entry_size = TessellationStore.get_entry_size(tmp_path)
+        try:
+            tmp_path.rename(entry_path)
+        except OSError:
+            # written concurrently by another process
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+
+        if self.max_bytes is not None:
+            if self.size is None:
+                self.prune(keep=entry_path)
+            else:
+                self.size += entry_size
+                if self.size > self.max_bytes:
+                    self.prune(keep=entry_path)
+
+    def __delitem__(self, key):
+        entry_path = self.get_entry_path(key)
+        if not entry_path.is_dir():
+            raise KeyError(key)
+        shutil.rmtree(entry_path)
+
+    def __iter__(self):
+        def to_tuple(value):
+            return tuple(map(to_tuple, value)) if isinstance(value, list) else value
+
+        for key_path in self.path.glob("*/key.json"):
+            if key_path.parent.suffix != ".tmp":
+                yield to_tuple(json.loads(key_path.read_text()))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
 class CadHelper:
+    # vertex arrays of the current run keyed by TShape and location, disabled when None, see vertex_caching
+    vertex_cache: Optional[dict[ShapeKey, np.ndarray]] = None
+
+    @staticmethod
+    @contextmanager
+    def vertex_caching():
+        """
+        Cache vertex arrays in a new cache for the duration of the block, the previous cache is restored even on errors
+        """
+        prev_vertex_cache = CadHelper.vertex_cache
+        CadHelper.vertex_cache = {}
+        try:
+            yield
+        finally:
+            CadHelper.vertex_cache = prev_vertex_cache
+
     @staticmethod
     def rgba_int_to_float(rgb_int: Iterable[float]):
         """
@@ -84,16 +232,19 @@ class CadHelper:
         return (geom_point.X(), geom_point.Y(), geom_point.Z())
 
     @staticmethod
-    def tesselate_shape(shape: cq.Solid):
+    def tesselate_shape(shape: cq.Solid, deviation: float = 0.1, angular_tolerance: float = 0.2):
+        """
+        Tessellate a shape, the deviation is relative to the size of its bounding box
+        """
         tess = Tessellator("")
 
         bb = bounding_box(shape.wrapped, loc=get_location(None), optimal=False)
-        quality = compute_quality(bb, deviation=0.1)
+        quality = compute_quality(bb, deviation=deviation)
 
         tess.compute(
             shape.wrapped,
             quality,
-            angular_tolerance=0.2,
+            angular_tolerance=angular_tolerance,
             compute_faces=True,
             compute_edges=True,
             debug=False,
@@ -109,6 +260,99 @@ class CadHelper:
             edges=edges,
         )
 
+    @staticmethod
+    def get_mesh_arrays(mesh: Mesh) -> dict[str, np.ndarray]:
+        return {
+            "vertices": np.asarray(mesh.vertices, dtype=np.float32),
+            "normals": np.asarray(mesh.normals, dtype=np.float32),
+            "triangles": np.asarray(mesh.simplices, dtype=np.uint32),
+            "edges": np.asarray(mesh.edges, dtype=np.float32),
+        }
+
+    @staticmethod
+    def tesselate_brep(
+        source: Union[Path, str, bytes], 
+        store_path: Union[Path, str], 
+        key: Hashable, 
+        deviation: float = 0.1, 
+        angular_tolerance: float = 0.2,
+    ):
+        """
+        Tessellate a shape from a BREP file or binary BREP bytes and save the mesh to the tessellation store,
+        used in worker processes so the buffers are passed back as memory mapped files instead of being pickled.
+        Returns the tessellation time in seconds.
+        """
+        start = time.perf_counter()
+        shape = CadHelper.import_brep_bytes(source) if isinstance(source, bytes) else CadHelper.import_brep(source)
+        mesh = CadHelper.tesselate_shape(cq.Shape.cast(shape), deviation, angular_tolerance)
+        # the store is pruned by the main process once the batch is done
+        TessellationStore(store_path, max_bytes=None)[key] = CadHelper.get_mesh_arrays(mesh)
+        return time.perf_counter() - start
+
+    @staticmethod
+    def tesselate_shapes(
+        shapes: Mapping[Hashable, Union[cq.Shape, Path, str]], 
+        store: Optional[TessellationStore] = None, 
+        workers: int = 1,
+        deviation: float = 0.1,
+        angular_tolerance: float = 0.2,
+    ) -> dict[Hashable, dict[str, np.ndarray]]:
+        """
+        Tessellate shapes or BREP files by key, in a process pool when workers > 1.
+        Meshes are saved to the store and returned as dicts of vertices, normals, triangles and edges arrays.
+        Without a store the meshes are passed through a temporary one and copied into memory.
+        """
+        if store is None:
+            if workers <= 1 or len(shapes) <= 1:
+                meshes = {}
+                for key, shape in shapes.items():
+                    if isinstance(shape, (Path, str)):
+                        shape = cq.Shape.cast(CadHelper.import_brep(shape))
+                    meshes[key] = CadHelper.get_mesh_arrays(CadHelper.tesselate_shape(shape, deviation, angular_tolerance))
+                return meshes
+            with tempfile.TemporaryDirectory() as tmp_path:
+                meshes = CadHelper.tesselate_shapes(shapes, TessellationStore(tmp_path), workers, deviation, angular_tolerance)
+                return {key: {name: np.array(array) for name, array in mesh.items()} for key, mesh in meshes.items()}
+
+        if workers <= 1 or len(shapes) <= 1:
+            meshes = {}
+            for key, shape in shapes.items():
+                if isinstance(shape, (Path, str)):
+                    shape = cq.Shape.cast(CadHelper.import_brep(shape))
+                store[key] = CadHelper.get_mesh_arrays(CadHelper.tesselate_shape(shape, deviation, angular_tolerance))
+                # read back before the next write can prune it
+                meshes[key] = store[key]
+            return meshes
+
+        workers = min(workers, len(shapes))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    CadHelper.tesselate_brep, 
+                    shape if isinstance(shape, (Path, str)) else CadHelper.export_brep_bytes(shape.wrapped), 
+                    store.path, 
+                    key,
+                    deviation,
+                    angular_tolerance,
+                )
+                for key, shape in shapes.items()
+            ]
+            for future in as_completed(futures):
+                future.result()
+        meshes = {key: store[key] for key in shapes}
+        store.prune()
+        return meshes
+
+    @staticmethod
+    def get_location(rotmat: RotationMatrixLike, offset: VectorLike):
+        transformation = gp_Trsf()
+        transformation.SetValues(
+            rotmat[0][0], rotmat[0][1], rotmat[0][2], offset[0],
+            rotmat[1][0], rotmat[1][1], rotmat[1][2], offset[1],
+            rotmat[2][0], rotmat[2][1], rotmat[2][2], offset[2],
+        )
+        return cq.Location(transformation)
+
     @staticmethod
     def transform_solid(
         solid: cq.Solid, rotmat: RotationMatrixLike, offset: Optional[VectorLike] = None
@@ -127,16 +371,51 @@ class CadHelper:
     @staticmethod
     def import_brep(file_path: Union[Path, str]):
         """
-        Import a boundary representation model
+        Import a boundary representation model, the text and binary formats are detected and may be gzip compressed
         Returns a TopoDS_Shape object
         """
+        with open(file_path, "rb") as f:
+            header = f.read(64)
+
+        if header.startswith(GZIP_MAGIC):
+            data = gzip.decompress(Path(file_path).read_bytes())
+            if BINARY_BREP_HEADER in data[:64]:
+                return CadHelper.import_brep_bytes(data)
+            source: Union[io.BytesIO, str] = io.BytesIO(data)
+        elif BINARY_BREP_HEADER in header:
+            return CadHelper.import_brep_bytes(Path(file_path).read_bytes())
+        else:
+            source = str(file_path)
+
         builder = BRep_Builder()
         shape = TopoDS_Shape()
-        return_code = BRepTools.Read_s(shape, str(file_path), builder)
-        if return_code is False:
+        return_code = BRepTools.Read_s(shape, source, builder)
+        if return_code is False or shape.IsNull():
             raise ValueError("Import failed, check file name")
         return shape
     
+    @staticmethod
+    def import_brep_bytes(data: bytes):
+        """
+        Import a boundary representation model from in-memory binary BREP bytes
+        Returns a TopoDS_Shape object
+        """
+        shape = TopoDS_Shape()
+        BinTools.Read_s(shape, io.BytesIO(data))
+        if shape.IsNull():
+            raise ValueError("Import failed, invalid BREP data")
+        return shape
+
+    @staticmethod
+    def read_brep_file_bytes(file_path: Union[Path, str]):
+        """
+        Read a BREP file into binary BREP bytes, returns the bytes and the read time in seconds.
+        Used to load parts in worker processes, binary BREP is much faster to import than the text format.
+        """
+        start = time.perf_counter()
+        data = CadHelper.export_brep_bytes(CadHelper.import_brep(file_path))
+        return data, time.perf_counter() - start
+
     @staticmethod
     def import_step(file_path: Union[Path, str]) -> cq.Assembly:
         """
@@ -165,16 +444,70 @@ class CadHelper:
         raise ValueError("Invalid file type")
 
     @staticmethod
-    def export_brep(shape: TopoDS_Shape, file_path: str):
-        BRepTools.Write_s(shape, file_path)
+    def export_brep(shape: TopoDS_Shape, file_path: str, binary: bool = False, compress: bool = False):
+        if not binary and not compress:
+            BRepTools.Write_s(shape, file_path)
+            return
+        Path(file_path).write_bytes(CadHelper.export_brep_data(shape, binary, compress))
+
+    @staticmethod
+    def export_brep_data(shape: TopoDS_Shape, binary: bool = False, compress: bool = False) -> bytes:
+        """
+        Export a shape to the contents of a BREP file in the given format
+        """
+        if binary:
+            data = CadHelper.export_brep_bytes(shape)
+        else:
+            stream = io.BytesIO()
+            BRepTools.Write_s(shape, stream)
+            data = stream.getvalue()
+        if compress:
+            # no timestamp so unchanged parts compress to the same bytes
+            data = gzip.compress(data, mtime=0)
+        return data
+
+    @staticmethod
+    def get_brep_format(file_path: Union[Path, str]):
+        """
+        Returns whether a BREP file is in the binary format and whether it is gzip compressed
+        """
+        with open(file_path, "rb") as f:
+            header = f.read(64)
+        if header.startswith(GZIP_MAGIC):
+            with gzip.open(file_path, "rb") as f:
+                return BINARY_BREP_HEADER in f.read(64), True
+        return BINARY_BREP_HEADER in header, False
+
+    @staticmethod
+    def export_brep_bytes(shape: TopoDS_Shape) -> bytes:
+        # binary BREP round trips doubles exactly, the text format does not
+        stream = io.BytesIO()
+        BinTools.Write_s(shape, stream)
+        return stream.getvalue()
 
     @staticmethod
     def normalize_part(solid: cq.Solid, norm_axis: bool = False):
+        curr_solid, offset, rotmat, _ = CadHelper.normalize_part_steps(solid, norm_axis)
+        return curr_solid, offset, rotmat
+
+    @staticmethod
+    def apply_normalization(solid: cq.Solid, offset: VectorLike, axis_rotmats: list[np.ndarray]):
+        """
+        Replays the steps returned by normalize_part_steps, giving the exact same normalized solid
+        """
+        curr_solid = solid.translate((-np.asarray(offset)).tolist())
+        for axis_rotmat in axis_rotmats:
+            curr_solid = CadHelper.transform_solid(curr_solid, axis_rotmat)
+        return curr_solid
+
+    @staticmethod
+    def normalize_part_steps(solid: cq.Solid, norm_axis: bool = False):
         offset = np.array(solid.Center().toTuple())
         centered_solid = solid.translate((-offset).tolist())
 
         curr_solid = centered_solid
         rotmat_axis_of_inertia = np.eye(3)
+        axis_rotmats: list[np.ndarray] = []
 
         if norm_axis:
             has_symetric_axis = False
@@ -225,9 +558,10 @@ class CadHelper:
 
                 rotmat_axis_of_inertia = axis_of_inertias.dot(rotmat_axis_of_inertia)
                 curr_solid = CadHelper.transform_solid(curr_solid, axis_of_inertias)
+                axis_rotmats.append(axis_of_inertias)
         
         rotmat = rotmat_axis_of_inertia.T
-        return curr_solid, offset, rotmat
+        return curr_solid, offset, rotmat, axis_rotmats
 
     @staticmethod
     def geo_align_vertices(vertices1, vertices2):
@@ -257,11 +591,51 @@ class CadHelper:
         
         return rotation_matrix
 
+    @staticmethod
+    def get_location_key(location: TopLoc_Location):
+        if location.IsIdentity():
+            return ()
+        transformation = location.Transformation()
+        return tuple(transformation.Value(i, j) for i in range(1, 4) for j in range(1, 5))
+
+    @staticmethod
+    def get_shape_key(shape: Union[cq.Shape, TopoDS_Shape]) -> ShapeKey:
+        """
+        Key that is equal for shapes sharing the same underlying TShape and location
+        """
+        wrapped = shape.wrapped if isinstance(shape, cq.Shape) else shape
+        return (wrapped.TShape(), CadHelper.get_location_key(wrapped.Location()))
+
+    @staticmethod
+    def get_vertex_array(shape: Union[cq.Shape, TopoDS_Shape]) -> np.ndarray:
+        """
+        Get the unique vertices of a shape as a read-only (N,3) float64 array, in the same order as cq.Shape.Vertices().
+        Arrays are cached per TShape and location inside a CadHelper.vertex_caching block.
+        """
+        wrapped = shape.wrapped if isinstance(shape, cq.Shape) else shape
+        key = None
+        if CadHelper.vertex_cache is not None:
+            key = CadHelper.get_shape_key(wrapped)
+            if key in CadHelper.vertex_cache:
+                return CadHelper.vertex_cache[key]
+
+        vertex_map = TopTools_IndexedMapOfShape()
+        TopExp.MapShapes_s(wrapped, TopAbs_VERTEX, vertex_map)
+        vertices = np.empty((vertex_map.Extent(), 3), dtype=np.float64)
+        for i in range(vertex_map.Extent()):
+            vertices[i] = BRep_Tool.Pnt_s(TopoDS.Vertex_s(vertex_map.FindKey(i + 1))).Coord()
+        vertices.flags.writeable = False
+
+        if key is not None:
+            cast(dict, CadHelper.vertex_cache)[key] = vertices
+        return vertices
+
     @staticmethod
     def align_parts(part1: cq.Solid, part2: cq.Solid):
-        vertices1 = np.array([vertex.toTuple() for vertex in part1.Vertices()])
-        vertices2 = np.array([vertex.toTuple() for vertex in part2.Vertices()])
+        return CadHelper.align_vertices(CadHelper.get_vertex_array(part1), CadHelper.get_vertex_array(part2))
 
+    @staticmethod
+    def align_vertices(vertices1: np.ndarray, vertices2: np.ndarray):
         assert len(vertices1) == len(vertices2), "solid1 and solid2 are different"
         
         rotmat = CadHelper.geo_align_vertices(vertices2, vertices1)
@@ -274,11 +648,7 @@ class CadHelper:
 
     @staticmethod
     def get_part_checksum(solid: Union[cq.Solid, TopoDS_Solid], precision=3):
-        solid = solid if isinstance(solid, cq.Solid) else cq.Solid(solid)
-
-        vertices = np.array(
-            [CadHelper.vertex_to_Tuple(TopoDS.Vertex_s(v)) for v in solid._entities("Vertex")]
-        )
+        vertices = CadHelper.get_vertex_array(solid)
 
         rounded_vertices = np.round(vertices, precision)
         rounded_vertices[rounded_vertices == -0] = 0
@@ -290,19 +660,12 @@ class CadHelper:
         return hashlib.md5(vertices_hash).hexdigest()
 
     @staticmethod
-    def save_cache(cache: LRUCache, path: Union[str, Path]):
-        with open(path, 'wb') as f:
-            pickle.dump(cache, f)
-
-    # Function to load cache from a file
-    @staticmethod
-    def load_cache(path: Union[str, Path]):
-
-        try:
-            with open(path, 'rb') as f:
-                return pickle.load(f)
-        except FileNotFoundError:
-            return LRUCache(maxsize=cache_size, getsizeof=get_size)
+    def get_file_checksum(file_path: Union[Path, str], chunk_size: int = 1 << 20):
+        file_hash = hashlib.md5()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
 
     @staticmethod
     def get_viewer(cad_obj, cache_path: Union[Path, str, None] = None, remote_viewer: bool = False):
@@ -312,17 +675,9 @@ class CadHelper:
             from jupyter_cadquery import show
         from jupyter_cadquery.tessellator import create_cache
 
-        if cache_path and Path(cache_path).exists():
-            with open(cache_path, 'rb') as f:
-                cache = pickle.load(f)
-        else:
-            cache = create_cache()
-                # print(tess.cache)   
-        viewer = show(cad_obj, cache=cache, viewer=None)
-
-        if cache_path:
-            CadHelper.save_cache(cache, cache_path)
-        return viewer
+        # meshes are read from and written to the store one part at a time while tessellating
+        cache = TessellationStore(cache_path) if cache_path else create_cache()
+        return show(cad_obj, cache=cache, viewer=None)
     
     @staticmethod
     def assert_correctly_aligned(base_part: cq.Solid, aligned_part: cq.Solid, rotmat: RotationMatrixLike, offset: VectorLike):
@@ -20,18 +20,38 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from typing import Optional
+import os
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 from pathlib import Path
 import yaml
 
-
-# Assuming ProjectOptions is defined in cad_service.py
-from orion_cli.services.cad_service import ProjectOptions
-
 CadPath = str
 GitRepoUrl = str
 
+# ProjectOptions lives here rather than in cad_service so reading a config does not import the CAD stack
+class ProjectOptions(BaseModel):
+    max_name_depth: int = 3
+    normalize_axis: bool = False
+    use_references: bool = True
+    include_assets: bool = False
+    # number of worker processes used for part ingestion, 0 uses all available cores
+    workers: int = 1
+    # format of the inventory part files, binary BREP is smaller and faster to read
+    part_format: Literal["text", "binary"] = "text"
+    compress_parts: bool = False
+    # hidden line removal used for the SVG assets, auto opts in to the polygonal one for shapes with many faces
+    svg_hlr_mode: Literal["exact", "poly", "auto"] = "exact"
+    svg_deflection: Optional[float] = None
+    # format of the part and assembly thumbnails, png is a shaded render that is much faster for large assemblies
+    thumbnail_format: Literal["svg", "png"] = "svg"
+    # number of file backed parts kept in memory after the inventory is written, unlimited when None
+    max_loaded_parts: Optional[int] = None
+
+    @property
+    def num_workers(self):
+        return self.workers if self.workers > 0 else (os.cpu_count() or 1)
+
 
 class ProjectConfig(BaseModel):
     name: str
@@ -0,0 +1,272 @@
+# MIT License
+#
+# Copyright (c) 2025 Open Orion, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from collections.abc import Hashable, Mapping
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import struct
+from typing import BinaryIO, Optional, Union
+import numpy as np
+
+GLB_MAGIC = b"glTF"
+GLB_VERSION = 2
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+
+GLTF_BYTE = 5120
+GLTF_SHORT = 5122
+GLTF_UNSIGNED_SHORT = 5123
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+# quantized vertex attributes are padded to 4 byte strides as required by glTF
+POSITION_STRIDE = 8
+NORMAL_STRIDE = 4
+SHORT_MAX = 32767
+BYTE_MAX = 127
+
+
+@dataclass
+class GltfNode:
+    """
+    Node of the exported scene, mesh is a (mesh key, rgba color) pair and nodes with a mesh are leaves
+    """
+    name: str
+    matrix: Optional[np.ndarray] = None
+    mesh: Optional[tuple[Hashable, tuple[float, ...]]] = None
+    children: list["GltfNode"] = field(default_factory=list)
+
+
+@dataclass
+class GltfMeshLayout:
+    vertex_count: int
+    index_count: int
+    center: np.ndarray
+    scale: float
+    offset: int
+
+    @property
+    def index_type(self):
+        return GLTF_UNSIGNED_SHORT if self.vertex_count <= 0xFFFF else GLTF_UNSIGNED_INT
+
+    @property
+    def index_size(self):
+        return 2 if self.index_type == GLTF_UNSIGNED_SHORT else 4
+
+    @property
+    def positions_size(self):
+        return self.vertex_count * POSITION_STRIDE
+
+    @property
+    def normals_size(self):
+        return self.vertex_count * NORMAL_STRIDE
+
+    @property
+    def indices_size(self):
+        return GltfHelper.pad4(self.index_count * self.index_size)
+
+    @property
+    def size(self):
+        return self.positions_size + self.normals_size + self.indices_size
+
+    @property
+    def dequantization_matrix(self):
+        # normalized int16 positions are in [-1, 1], the node transform scales them back to model units
+        matrix = np.eye(4)
+        matrix[:3, :3] *= self.scale
+        matrix[:3, 3] = self.center
+        return matrix
+
+
+class GltfHelper:
+    @staticmethod
+    def pad4(size: int):
+        return (size + 3) & ~3
+
+    @staticmethod
+    def get_mesh_layout(mesh: Mapping[str, np.ndarray], offset: int):
+        vertices = np.asarray(mesh["vertices"], dtype=np.float64).reshape(-1, 3)
+        if len(vertices):
+            lower, upper = vertices.min(axis=0), vertices.max(axis=0)
+        else:
+            lower = upper = np.zeros(3)
+        # uniform scale so normals are not skewed by the dequantization transform
+        scale = float(np.max(upper - lower)) / 2 or 1.0
+        return GltfMeshLayout(
+            vertex_count=len(vertices),
+            index_count=int(np.size(mesh["triangles"])),
+            center=(lower + upper) / 2,
+            scale=scale,
+            offset=offset,
+        )
+
+    @staticmethod
+    def quantize_positions(vertices: np.ndarray, layout: GltfMeshLayout):
+        quantized = np.zeros((len(vertices), POSITION_STRIDE // 2), dtype="<i2")
+        normalized = (np.asarray(vertices, dtype=np.float64).reshape(-1, 3) - layout.center) / layout.scale
+        quantized[:, :3] = np.clip(np.round(normalized * SHORT_MAX), -SHORT_MAX, SHORT_MAX)
+        return quantized
+
+    @staticmethod
+    def quantize_normals(normals: np.ndarray, vertex_count: int):
+        quantized = np.zeros((vertex_count, NORMAL_STRIDE), dtype="i1")
+        normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+        if len(normals) == vertex_count:
+            quantized[:, :3] = np.clip(np.round(normals * BYTE_MAX), -BYTE_MAX, BYTE_MAX)
+        return quantized
+
+    @staticmethod
+    def get_node_json(node: GltfNode, layouts: Mapping[Hashable, GltfMeshLayout], mesh_ids: dict, nodes: list[dict]):
+        """
+        Append the node and its children to the node list depth first, returns the index of the node
+        """
+        node_json: dict = {"name": node.name}
+        matrix = np.eye(4) if node.matrix is None else np.asarray(node.matrix, dtype=np.float64)
+        if node.mesh is not None and layouts[node.mesh[0]].index_count:
+            node_json["mesh"] = mesh_ids.setdefault(node.mesh, len(mesh_ids))
+            matrix = matrix @ layouts[node.mesh[0]].dequantization_matrix
+        if not np.array_equal(matrix, np.eye(4)):
+            # glTF matrices are column major
+            node_json["matrix"] = matrix.T.flatten().tolist()
+
+        index = len(nodes)
+        nodes.append(node_json)
+        if node.children:
+            node_json["children"] = [GltfHelper.get_node_json(child, layouts, mesh_ids, nodes) for child in node.children]
+        return index
+
+    @staticmethod
+    def get_gltf_json(root: GltfNode, meshes: Mapping[Hashable, Mapping[str, np.ndarray]]):
+        """
+        Build the glTF document of the scene, each mesh key is stored once with KHR_mesh_quantization
+        and every color it is used with is a glTF mesh sharing the same accessors.
+        Returns the document and the binary buffer layout of each mesh.
+        """
+        layouts: dict[Hashable, GltfMeshLayout] = {}
+        offset = 0
+        for key, mesh in meshes.items():
+            layouts[key] = GltfHelper.get_mesh_layout(mesh, offset)
+            # meshes without triangles are not exported and take no space in the buffer
+            if layouts[key].index_count:
+                offset += layouts[key].size
+
+        nodes: list[dict] = []
+        mesh_ids: dict[tuple[Hashable, tuple[float, ...]], int] = {}
+        GltfHelper.get_node_json(root, layouts, mesh_ids, nodes)
+
+        buffer_views: list[dict] = []
+        accessors: list[dict] = []
+        attributes: dict[Hashable, tuple[dict, int]] = {}
+        for key, layout in layouts.items():
+            if not layout.index_count:
+                continue
+            buffer_views += [
+                {"buffer": 0, "byteOffset": layout.offset, "byteLength": layout.positions_size, "byteStride": POSITION_STRIDE, "target": GLTF_ARRAY_BUFFER},
+                {"buffer": 0, "byteOffset": layout.offset + layout.positions_size, "byteLength": layout.normals_size, "byteStride": NORMAL_STRIDE, "target": GLTF_ARRAY_BUFFER},
+                {"buffer": 0, "byteOffset": layout.offset + layout.positions_size + layout.normals_size, "byteLength": layout.index_count * layout.index_size, "target": GLTF_ELEMENT_ARRAY_BUFFER},
+            ]
+            vertices = np.asarray(meshes[key]["vertices"], dtype=np.float64).reshape(-1, 3)
+            quantized = GltfHelper.quantize_positions(np.stack([vertices.min(axis=0), vertices.max(axis=0)]), layout)
+            accessors += [
+                {
+                    "bufferView": len(buffer_views) - 3, "componentType": GLTF_SHORT, "normalized": True, "count": layout.vertex_count, "type": "VEC3",
+                    "min": quantized[0, :3].tolist(), "max": quantized[1, :3].tolist(),
+                },
+                {"bufferView": len(buffer_views) - 2, "componentType": GLTF_BYTE, "normalized": True, "count": layout.vertex_count, "type": "VEC3"},
+                {"bufferView": len(buffer_views) - 1, "componentType": layout.index_type, "count": layout.index_count, "type": "SCALAR"},
+            ]
+            attributes[key] = ({"POSITION": len(accessors) - 3, "NORMAL": len(accessors) - 2}, len(accessors) - 1)
+
+        materials: dict[tuple[float, ...], int] = {}
+        gltf_meshes = []
+        for (key, color), _ in sorted(mesh_ids.items(), key=lambda item: item[1]):
+            if color not in materials:
+                materials[color] = len(materials)
+            mesh_attributes, indices = attributes[key]
+            gltf_meshes.append({
+                "primitives": [{"attributes": mesh_attributes, "indices": indices, "material": materials[color]}]
+            })
+
+        gltf = {
+            "asset": {"version": "2.0", "generator": "orion_cli"},
+            "extensionsUsed": ["KHR_mesh_quantization"],
+            "extensionsRequired": ["KHR_mesh_quantization"],
+            "scene": 0,
+            "scenes": [{"nodes": [0]}],
+            "nodes": nodes,
+            "meshes": gltf_meshes,
+            "materials": [
+                {
+                    "pbrMetallicRoughness": {"baseColorFactor": [*color[:3], color[3] if len(color) > 3 else 1.0], "metallicFactor": 0.0, "roughnessFactor": 0.6},
+                    **({"alphaMode": "BLEND"} if len(color) > 3 and color[3] < 1 else {}),
+                }
+                for color in materials
+            ],
+            "accessors": accessors,
+            "bufferViews": buffer_views,
+            "buffers": [{"byteLength": offset}],
+        }
+        if not accessors:
+            # the buffer can not be empty
+            for name in ["accessors", "bufferViews", "buffers"]:
+                del gltf[name]
+        return gltf, layouts
+
+    @staticmethod
+    def write_glb_chunks(f: BinaryIO, gltf: dict, meshes: Mapping[Hashable, Mapping[str, np.ndarray]], layouts: Mapping[Hashable, GltfMeshLayout]):
+        json_data = json.dumps(gltf, separators=(",", ":")).encode()
+        json_data += b" " * (GltfHelper.pad4(len(json_data)) - len(json_data))
+        buffer_size = gltf["buffers"][0]["byteLength"] if "buffers" in gltf else 0
+        total_size = 12 + 8 + len(json_data) + (8 + buffer_size if buffer_size else 0)
+
+        f.write(struct.pack("<4sII", GLB_MAGIC, GLB_VERSION, total_size))
+        f.write(struct.pack("<II", len(json_data), GLB_CHUNK_JSON))
+        f.write(json_data)
+        if not buffer_size:
+            return
+
+        # mesh buffers are quantized and written one at a time, the whole binary is never held in memory
+        f.write(struct.pack("<II", buffer_size, GLB_CHUNK_BIN))
+        for key, layout in layouts.items():
+            if not layout.index_count:
+                continue
+            mesh = meshes[key]
+            f.write(GltfHelper.quantize_positions(mesh["vertices"], layout).tobytes())
+            f.write(GltfHelper.quantize_normals(mesh["normals"], layout.vertex_count).tobytes())
+            indices = np.asarray(mesh["triangles"]).reshape(-1).astype("<u2" if layout.index_size == 2 else "<u4")
+            f.write(indices.tobytes())
+            f.write(b"\0" * (layout.indices_size - indices.nbytes))
+
+    @staticmethod
+    def export_glb(root: GltfNode, meshes: Mapping[Hashable, Mapping[str, np.ndarray]], file_path: Union[Path, str]):
+        """
+        Export the scene to a binary glTF file, written through a temporary file
+        """
+        file_path = Path(file_path)
+        gltf, layouts = GltfHelper.get_gltf_json(root, meshes)
+        tmp_path = file_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            GltfHelper.write_glb_chunks(f, gltf, meshes, layouts)
+        os.replace(tmp_path, file_path)
@@ -20,37 +20,69 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+from collections.abc import Iterable, Iterator, MutableMapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
+import base64
+import hashlib
+import io
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Optional, OrderedDict, Sized, Union, cast
+import shutil
+import sys
+import time
+from typing import Annotated, ClassVar, Literal, Optional, OrderedDict, TextIO, Union, cast
+from weakref import WeakValueDictionary
 import numpy as np
 import cadquery as cq
-from pydantic import BaseModel, ConfigDict, Field
-from scipy.spatial.transform import Rotation as R
-import shutil
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, field_validator
 import cadquery as cq
-from orion_cli.helpers.asset_helper import AssetHelper, SVGOptions
-from orion_cli.helpers.cad_helper import CadHelper
-import pandas as pd
+from orion_cli.helpers.asset_helper import AssetHelper, PNGOptions, SVGOptions
+from orion_cli.helpers.cad_helper import CadHelper, ShapeKey, TessellationStore
+from orion_cli.helpers.gltf_helper import GltfHelper, GltfNode
+from orion_cli.helpers.config_helper import ProjectOptions
 from orion_cli.helpers.numpy_helper import NdArray
 from orion_cli.services.log_service import logger
+from orion_cli.templates.viewer_template import VIEWER_TEMPLATE
 from OCP.gp import gp_Trsf
 
 # Parameter Labels
 PartSurfaceArea = float
 PartNumVertices = int
 PartGroup = tuple[PartSurfaceArea, PartNumVertices]
-PartChecksum = str
+# paths and checksums repeat for every instance, interned so each distinct value is stored once
+PartChecksum = Annotated[str, AfterValidator(sys.intern)]
 AlignedPartChecksum = str
 PartName = str
-AssemblyPath = str
+AssemblyPath = Annotated[str, AfterValidator(sys.intern)]
+
+IDENTITY_ORIENTATION = np.eye(3)
+IDENTITY_ORIENTATION.flags.writeable = False
 
 INVENTORY_DIRECTORY = "inventory"
 PARTS_DIRECTORY = "inventory/parts"
 ASSEMBLY_DIRECTORY = "assemblies"
 ASSETS_DIRECTORY = "assets"
+# version 2 stores part locations relative to their assembly, files without a version have them in the root frame
+ASSEMBLY_FORMAT_VERSION = 2
+CACHE_DIRECTORY = ".orion_cache"
+ASSEMBLY_INDEX_CACHE_FILE = "assembly_index.json"
+ASSEMBLY_INDEX_CACHE_VERSION = 1
+PROJECT_MANIFEST_FILE = "manifest.json"
+PROJECT_MANIFEST_VERSION = 1
+PROJECT_SOURCE_FILE = "source.json"
+TESSELLATION_DIRECTORY = "tessellation"
+# tessellation tiers of the display meshes as (deviation, angular tolerance), the deviation is relative to the part size
+MeshLod = Literal["coarse", "medium", "fine"]
+MESH_LODS: dict[MeshLod, tuple[float, float]] = {"coarse": (2.0, 0.8), "medium": (0.5, 0.4), "fine": (0.1, 0.2)}
+# minimum part size relative to the root assembly for a tier, smaller parts use the coarse meshes
+MESH_LOD_THRESHOLDS: dict[MeshLod, float] = {"fine": 0.1, "medium": 0.01}
+DEFAULT_PART_COLOR = (0.7, 0.7, 0.7)
+INVENTORY_COLUMNS = ["Part", "Name", "Variation", "Quantity", "Color", "Price", "URL"]
+# variations above which inventory/README.md is split into pages
+INVENTORY_PAGE_SIZE = 2000
 
 class InvetoryPartVariationMetadata(BaseModel):
     price: Optional[float] = None
@@ -67,22 +99,131 @@ class CatalogItem(BaseModel):
     variations: list[InventoryPartVariation]
 
 class InventoryVariationRef(BaseModel):
+    model_config = ConfigDict(frozen=True)
     checksum: PartChecksum
     id: int
 
+    # one instance per variation, shared by all part references of the variation while any of them is alive
+    interned: ClassVar[WeakValueDictionary[tuple[str, int], "InventoryVariationRef"]] = WeakValueDictionary()
+
     def __hash__(self):
         return hash((self.checksum, self.id))
 
+    @staticmethod
+    def intern(ref: "InventoryVariationRef"):
+        return InventoryVariationRef.interned.setdefault((ref.checksum, ref.id), ref)
+
 class InventoryCatalog(BaseModel):
     items: dict[PartChecksum, CatalogItem] = {}
 
 
+class InventoryParts(MutableMapping[PartChecksum, cq.Solid]):
+    """
+    Parts of the inventory, parts registered with a BREP file are only loaded on first access
+    """
+    def __init__(self, max_loaded: Optional[int] = None):
+        # maximum number of file backed parts kept loaded, least recently used are evicted first
+        self.max_loaded = max_loaded
+        self.paths: dict[PartChecksum, Optional[Path]] = {}
+        self.solids: OrderedDict[PartChecksum, cq.Solid] = OrderedDict()
+
+    def register(self, checksum: PartChecksum, brep_path: Union[Path, str], keep_loaded: bool = False):
+        """
+        Back a part with a BREP file, a loaded part is kept until it is evicted when keep_loaded is set
+        """
+        self.paths[checksum] = Path(brep_path)
+        if not keep_loaded:
+            self.solids.pop(checksum, None)
+
+    def is_loaded(self, checksum: PartChecksum):
+        return checksum in self.solids
+
+    def load(self, checksums: Optional[Iterable[PartChecksum]] = None, workers: int = 1):
+        """
+        Load file backed parts in bulk, in a process pool when workers > 1.
+        Returns the load time in seconds of every part that was loaded.
+        """
+        checksums = [
+            checksum for checksum in (self.paths if checksums is None else checksums)
+            if checksum not in self.solids and self.paths.get(checksum) is not None
+        ]
+        brep_paths = [cast(Path, self.paths[checksum]) for checksum in checksums]
+        timings: dict[PartChecksum, float] = {}
+        load_start = time.perf_counter()
+        if workers > 1 and len(checksums) > 1:
+            workers = min(workers, len(checksums))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    CadHelper.read_brep_file_bytes, 
+                    brep_paths, 
+                    chunksize=max(1, len(checksums) // (workers * 4))
+                )
+                for checksum, (data, read_time) in zip(checksums, results):
+                    start = time.perf_counter()
+                    self.solids[checksum] = cq.Solid(CadHelper.import_brep_bytes(data))
+                    timings[checksum] = read_time + time.perf_counter() - start
+        else:
+            for checksum, brep_path in zip(checksums, brep_paths):
+                start = time.perf_counter()
+                self.solids[checksum] = cq.Solid(CadHelper.import_brep(brep_path))
+                timings[checksum] = time.perf_counter() - start
+
+        if timings:
+            logger.info(f"Loaded {len(timings)} parts in {time.perf_counter() - load_start:.2f}s with {workers} workers, slowest parts:")
+            for checksum in sorted(timings, key=timings.__getitem__, reverse=True)[:5]:
+                logger.info(f"- {cast(Path, self.paths[checksum]).name}: {timings[checksum]:.3f}s")
+        if self.max_loaded is not None:
+            self.evict(self.max_loaded)
+        return timings
+
+    def evict(self, max_loaded: int = 0):
+        """
+        Unload file backed parts, least recently used first, until at most max_loaded parts are loaded
+        """
+        for checksum in list(self.solids):
+            if len(self.solids) <= max_loaded:
+                break
+            if self.paths.get(checksum) is not None:
+                del self.solids[checksum]
+
+    def __getitem__(self, checksum: PartChecksum) -> cq.Solid:
+        if checksum in self.solids:
+            self.solids.move_to_end(checksum)
+            return self.solids[checksum]
+
+        brep_path = self.paths[checksum]
+        if brep_path is None:
+            raise KeyError(checksum)
+        solid = cq.Solid(CadHelper.import_brep(brep_path))
+        self.solids[checksum] = solid
+        if self.max_loaded is not None:
+            self.evict(self.max_loaded)
+        return solid
+
+    def __setitem__(self, checksum: PartChecksum, solid: cq.Solid):
+        self.paths[checksum] = None
+        self.solids[checksum] = solid
+
+    def __delitem__(self, checksum: PartChecksum):
+        del self.paths[checksum]
+        self.solids.pop(checksum, None)
+
+    def __contains__(self, checksum: object):
+        return checksum in self.paths
+
+    def __iter__(self) -> Iterator[PartChecksum]:
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+
 @dataclass
 class Inventory:
     """
     Catalog of all parts in the project
     """
-    parts: dict[PartChecksum, cq.Solid] = field(default_factory=dict)
+    parts: InventoryParts = field(default_factory=InventoryParts)
     catalog: InventoryCatalog = field(default_factory=InventoryCatalog)
     
     def get_variation(self, ref: InventoryVariationRef):
@@ -107,6 +248,12 @@ class Location(BaseModel):
     position: NdArray
     orientation: NdArray
 
+    @field_validator("orientation")
+    @classmethod
+    def share_identity(cls, orientation: np.ndarray):
+        # most parts are not rotated, they share one read only identity matrix
+        return IDENTITY_ORIENTATION if np.array_equal(orientation, IDENTITY_ORIENTATION) else orientation
+
     def to_cq(self):
         transformation = gp_Trsf()
         transformation.SetValues(
@@ -125,11 +272,20 @@ class Location(BaseModel):
         )
         return cq.Location(transformation)
 
+    def to_matrix(self):
+        matrix = np.eye(4)
+        matrix[:3, :3] = self.orientation
+        matrix[:3, 3] = self.position
+        return matrix
+
     @property
     def is_zero(self):
         return np.all(self.position == 0) and np.all(self.orientation == np.eye(3))
 
     def transform(self, location: Union["Location", cq.Location, None]):
+        """
+        Location in the frame that location is placed in, when self is relative to location
+        """
         if location is None:
             return self.model_copy()
         
@@ -137,8 +293,23 @@ class Location(BaseModel):
             location = Location.convert(location)
 
         return Location(
-            position=self.position + location.position,
-            orientation=self.orientation.dot(location.orientation)
+            position=location.orientation.dot(self.position) + location.position,
+            orientation=location.orientation.dot(self.orientation)
+        )
+
+    def relative_to(self, location: Union["Location", cq.Location, None]):
+        """
+        Location relative to location, the inverse of transform for rigid locations
+        """
+        if location is None:
+            return self.model_copy()
+
+        if isinstance(location, cq.Location):
+            location = Location.convert(location)
+
+        return Location(
+            position=location.orientation.T.dot(self.position - location.position),
+            orientation=location.orientation.T.dot(self.orientation)
         )
 
     @staticmethod
@@ -149,25 +320,37 @@ class Location(BaseModel):
             return loc
 
         transformation = loc.wrapped.Transformation()
-        translation = np.array([transformation.Value(1, 4), transformation.Value(2, 4), transformation.Value(3, 4)])
-        rotmat = np.array([
-            [transformation.Value(1, 1), transformation.Value(1, 2), transformation.Value(1, 3)],
-            [transformation.Value(2, 1), transformation.Value(2, 2), transformation.Value(2, 3)],
-            [transformation.Value(3, 1), transformation.Value(3, 2), transformation.Value(3, 3)],
-        ])
+        # rows of the scaled rotation in three calls rather than nine Value calls
+        vectorial_part = transformation.VectorialPart()
+        rotmat = np.array([vectorial_part.Row(1).Coord(), vectorial_part.Row(2).Coord(), vectorial_part.Row(3).Coord()])
 
         return Location(
-            position=translation,
+            position=np.array(transformation.TranslationPart().Coord()),
             orientation=rotmat
         )
 
+    @staticmethod
+    def to_matrices(locations: Iterable[Optional["Location"]]):
+        """
+        Stack locations into an (N, 4, 4) array, missing locations are the identity
+        """
+        locations = list(locations)
+        matrices = np.zeros((len(locations), 4, 4))
+        matrices[:, :3, :3] = np.eye(3)
+        matrices[:, 3, 3] = 1.0
+        for i, location in enumerate(locations):
+            if location is not None:
+                matrices[i, :3, :3] = location.orientation
+                matrices[i, :3, 3] = location.position
+        return matrices
+
 
 class PartRef(BaseModel):
     """
     Reference to a part in the inventory with a specific position and orientation (rotation matrix)
     """
-    path: str
-    variation: InventoryVariationRef
+    path: AssemblyPath
+    variation: Annotated[InventoryVariationRef, AfterValidator(InventoryVariationRef.intern)]
     location: Optional[Location] = None
 
     @property
@@ -179,6 +362,7 @@ class Assembly(BaseModel):
     """
     Assembly of parts and subassemblies as references
     """
+    version: int = ASSEMBLY_FORMAT_VERSION
     path: AssemblyPath
     location: Optional[Location] = None
     children: list[AssemblyPath] = Field(default_factory=list)
@@ -219,11 +403,83 @@ class Assembly(BaseModel):
 
         return cq_assembly
 
-class ProjectOptions(BaseModel):
-    max_name_depth: int = 3
-    normalize_axis: bool = False
-    use_references: bool = True
-    include_assets: bool = False
+@dataclass
+class TransformTable:
+    """
+    Placements of the project in contiguous arrays, part references and assemblies are indexed by
+    their position in depth first order from the root assembly, the order of CadService.get_part_instances
+    """
+    assembly_paths: list[AssemblyPath]
+    # index of the parent assembly, -1 for the root
+    assembly_parents: np.ndarray
+    # (M, 4, 4) locations relative to the parent assembly, the root location is ignored like in Assembly.to_cq
+    assembly_matrices: np.ndarray
+    part_paths: list[AssemblyPath]
+    # index of the assembly owning the part reference
+    part_assemblies: np.ndarray
+    # (N, 4, 4) locations relative to the owning assembly
+    part_matrices: np.ndarray
+
+    @staticmethod
+    def from_project(project: "Project"):
+        assembly_paths: list[AssemblyPath] = []
+        assembly_parents: list[int] = []
+        assembly_locations: list[Optional[Location]] = []
+        part_paths: list[AssemblyPath] = []
+        part_assemblies: list[int] = []
+        part_locations: list[Optional[Location]] = []
+
+        def add_assembly(assembly: Assembly, parent_id: int):
+            assembly_id = len(assembly_paths)
+            assembly_paths.append(assembly.path)
+            assembly_parents.append(parent_id)
+            assembly_locations.append(assembly.location if parent_id >= 0 else None)
+            for subassembly_path in assembly.children:
+                add_assembly(project.assemblies[subassembly_path], assembly_id)
+            for part_ref in assembly.parts:
+                part_paths.append(part_ref.path)
+                part_assemblies.append(assembly_id)
+                part_locations.append(part_ref.location)
+
+        add_assembly(project.root_assembly, -1)
+
+        return TransformTable(
+            assembly_paths=assembly_paths,
+            assembly_parents=np.array(assembly_parents, dtype=np.int64),
+            assembly_matrices=Location.to_matrices(assembly_locations),
+            part_paths=part_paths,
+            part_assemblies=np.array(part_assemblies, dtype=np.int64),
+            part_matrices=Location.to_matrices(part_locations),
+        )
+
+    @staticmethod
+    def compose(parent_matrices: np.ndarray, matrices: np.ndarray):
+        """
+        Batched parent @ child composition of (N, 4, 4) transforms
+        """
+        return np.matmul(parent_matrices, matrices)
+
+    def get_assembly_world_matrices(self):
+        """
+        Absolute transforms of the assemblies, composed one tree level at a time
+        """
+        world_matrices = self.assembly_matrices.copy()
+        depths = np.zeros(len(self.assembly_paths), dtype=np.int64)
+        # parents are always listed before their children
+        for i, parent_id in enumerate(self.assembly_parents):
+            if parent_id >= 0:
+                depths[i] = depths[parent_id] + 1
+        for depth in range(1, int(depths.max(initial=0)) + 1):
+            level = np.flatnonzero(depths == depth)
+            world_matrices[level] = TransformTable.compose(world_matrices[self.assembly_parents[level]], self.assembly_matrices[level])
+        return world_matrices
+
+    def get_part_world_matrices(self):
+        """
+        Absolute transforms of every part reference in one vectorized pass
+        """
+        return TransformTable.compose(self.get_assembly_world_matrices()[self.part_assemblies], self.part_matrices)
+
 
 @dataclass
 class Project:
@@ -231,11 +487,44 @@ class Project:
     part_refs: OrderedDict[AssemblyPath, PartRef] = field(default_factory=OrderedDict)
     inventory: Inventory = field(default_factory=Inventory)
     options: ProjectOptions = field(default_factory=ProjectOptions)
+    # oldest assembly format of the files the project was read from
+    format_version: int = ASSEMBLY_FORMAT_VERSION
     
     @property
     def root_assembly(self):
         return next(iter(self.assemblies.values()))
 
+    def get_transform_table(self):
+        return TransformTable.from_project(self)
+
+
+@dataclass(slots=True)
+class CanonicalPart:
+    """
+    Canonical form of a leaf part, computed independently of the rest of the assembly
+    """
+    part: Optional[cq.Solid] = None
+    checksum: Optional[PartChecksum] = None
+    aligned_checksum: Optional[AlignedPartChecksum] = None
+    part_group: Optional[PartGroup] = None
+    offset: Optional[np.ndarray] = None
+    rotmat: Optional[np.ndarray] = None
+    # normalization steps and vertices, sent instead of the solid since BREP does not round trip transformed geometry bit for bit
+    axis_rotmats: list[np.ndarray] = field(default_factory=list)
+    vertices: Optional[np.ndarray] = None
+
+
+@dataclass(slots=True)
+class PartInstance:
+    """
+    First placement of a shape, reused for every other instance of the same shape
+    """
+    base_part: cq.Solid
+    checksum: PartChecksum
+    abs_location: Location
+    # placement of the base part in the frame of the root assembly
+    location: Optional[Location] = None
+
 
 @dataclass
 class AssemblyIndex:
@@ -247,6 +536,11 @@ class AssemblyIndex:
     aligned_refs: dict[AlignedPartChecksum, PartRef] = field(default_factory=dict)
     part_names: dict[PartName, Optional[PartRef]] = field(default_factory=dict)
     part_colors: dict[PartChecksum, set[tuple[float]]] = field(default_factory=dict)
+    canonical_parts: dict[AssemblyPath, CanonicalPart] = field(default_factory=dict)
+    part_instances: dict[ShapeKey, PartInstance] = field(default_factory=dict)
+    # shapes used as references, kept apart from part_instances since references have no absolute placement
+    reference_checksums: dict[ShapeKey, PartChecksum] = field(default_factory=dict)
+    base_part_checksums: dict[PartGroup, PartChecksum] = field(default_factory=dict)
 
     # revisioning    
     prev_project: Optional["Project"] = None
@@ -254,6 +548,43 @@ class AssemblyIndex:
     is_assembly_modified: set[AssemblyPath] = field(default_factory=set)
 
 
+class BasePartEntry(BaseModel):
+    area: PartSurfaceArea
+    num_vertices: PartNumVertices
+    checksum: PartChecksum
+
+
+class AssemblyIndexCache(BaseModel):
+    """
+    Persisted caches of an AssemblyIndex, only valid for the catalog and options it was written with
+    """
+    version: int = ASSEMBLY_INDEX_CACHE_VERSION
+    catalog_checksum: str
+    normalize_axis: bool
+    base_parts: list[BasePartEntry] = Field(default_factory=list)
+    aligned_refs: dict[AlignedPartChecksum, PartRef] = Field(default_factory=dict)
+
+
+class ProjectManifest(BaseModel):
+    """
+    Catalog and assemblies of a project in one document, only valid while the files it was read from are unchanged
+    """
+    version: int = PROJECT_MANIFEST_VERSION
+    signature: str
+    catalog: InventoryCatalog
+    assemblies: list[Assembly] = Field(default_factory=list)
+
+
+class ProjectSource(BaseModel):
+    """
+    CAD file contents and options a project was last written from
+    """
+    cad_checksum: str
+    # catalog, assembly and part files as they were written
+    signature: str
+    options: ProjectOptions
+
+
 class CadService:
     @staticmethod
     def read_cq_assembly(
@@ -267,10 +598,25 @@ class CadService:
             project = Project()
         if index is None:
             index = AssemblyIndex()
-        if curr_path == "":
-            index.is_assembly_modified.clear()
-            index.is_part_modified.clear()
+        index.is_assembly_modified.clear()
+        index.is_part_modified.clear()
+        # vertex arrays are only cached while this assembly is read
+        with CadHelper.vertex_caching():
+            try:
+                if project.options.num_workers > 1:
+                    index.canonical_parts = CadService.canonicalize_parts(cq_assembly, project.options, index)
+                return CadService.read_cq_subassembly(cq_assembly, project, index, curr_abs_location, curr_path)
+            finally:
+                index.canonical_parts.clear()
 
+    @staticmethod
+    def read_cq_subassembly(
+        cq_assembly: cq.Assembly,
+        project: Project,
+        index: AssemblyIndex,
+        curr_abs_location: Optional[Location] = None,
+        curr_path: str = "",
+    ) -> tuple[list[Assembly], bool]:
         rel_location = Location.convert(cq_assembly.loc)
         root_assembly = Assembly(
             path=curr_path + f"/{cq_assembly.name}",
@@ -284,7 +630,7 @@ class CadService:
         is_modified = False
         for cq_subassembly in cq_assembly.children:
             if isinstance(cq_subassembly, cq.Assembly) and len(cq_subassembly.children):
-                subassemblies, is_sub_modified = CadService.read_cq_assembly(
+                subassemblies, is_sub_modified = CadService.read_cq_subassembly(
                     cq_subassembly,
                     project,
                     index,
@@ -325,7 +671,7 @@ class CadService:
                 part_checksum = part_ref.variation.checksum
 
                 # derive variation from color
-                part_color = list(CadHelper.rgba_float_to_int(cq_subassembly.color.toTuple())) if cq_subassembly.color else None
+                part_color = CadService.get_part_color(cq_subassembly)
                 existing_variation = project.inventory.get_variation_from_color(part_ref.variation.checksum, part_color)
                 
                 if part_checksum not in project.inventory.catalog.items:
@@ -349,7 +695,6 @@ class CadService:
 
                 CadService.assign_unique_part_names(part_ref, project, index)
 
-
         return assemblies, is_modified
 
 
@@ -388,21 +733,145 @@ class CadService:
         index: Optional[AssemblyIndex] = None,
         options: Optional[ProjectOptions] = None,
     ):
-        is_reference = (options and options.use_references) and cq_subassembly.metadata.get(
-            "is_reference", False
-        )
-        if is_reference:
-            return CadService.get_referenced_part(cq_subassembly, assembly_path, inventory)
+        canonical_part = index.canonical_parts.get(f"{assembly_path}/{cq_subassembly.name}") if index else None
+        if CadService.is_reference_part(cq_subassembly, options):
+            return CadService.get_referenced_part(cq_subassembly, assembly_path, inventory, index, canonical_part)
         else:
             normalize_axis=options is not None and options.normalize_axis
-            return CadService.get_non_reference_part(cq_subassembly, assembly_path, abs_location, inventory, index, normalize_axis)
+            return CadService.get_non_reference_part(cq_subassembly, assembly_path, abs_location, inventory, index, normalize_axis, canonical_part)
+
+    @staticmethod
+    def is_reference_part(cq_subassembly: cq.Assembly, options: Optional[ProjectOptions] = None) -> bool:
+        return bool((options and options.use_references) and cq_subassembly.metadata.get(
+            "is_reference", False
+        ))
+
+    @staticmethod
+    def get_leaf_parts(
+        cq_assembly: cq.Assembly,
+        curr_abs_location: Optional[Location] = None,
+        curr_path: str = "",
+    ):
+        """
+        Yields (path, cq_subassembly, abs_location) for every leaf part in the same order as read_cq_assembly visits them
+        """
+        rel_location = Location.convert(cq_assembly.loc)
+        assembly_path = curr_path + f"/{cq_assembly.name}"
+        abs_location = rel_location.transform(curr_abs_location)
+        for cq_subassembly in cq_assembly.children:
+            if isinstance(cq_subassembly, cq.Assembly) and len(cq_subassembly.children):
+                yield from CadService.get_leaf_parts(cq_subassembly, abs_location, assembly_path)
+            else:
+                yield f"{assembly_path}/{cq_subassembly.name}", cq_subassembly, abs_location
+
+    @staticmethod
+    def canonicalize_part(aligned_part: cq.Solid, normalize_axis: bool = False, aligned_checksum: Optional[AlignedPartChecksum] = None):
+        """
+        Computes everything about a located part that does not depend on the other parts in the assembly
+        """
+        part_group = (
+            np.round(aligned_part.Area(), 3),
+            len(CadHelper.get_vertex_array(aligned_part)),
+        )
+        normalized_part, offset, rotmat, axis_rotmats = CadHelper.normalize_part_steps(aligned_part, normalize_axis)
+        return CanonicalPart(
+            part=normalized_part,
+            aligned_checksum=aligned_checksum,
+            part_group=part_group,
+            offset=offset,
+            rotmat=rotmat,
+            axis_rotmats=axis_rotmats,
+        )
+
+    @staticmethod
+    def canonicalize_part_brep(part_brep: bytes, abs_location: Optional[Location], is_reference: bool, normalize_axis: bool):
+        """
+        Process pool worker for canonicalize_parts, parts are sent as BREP bytes and only numeric results are returned
+        """
+        # parts of different tasks never share a TShape, so only cache within the task
+        with CadHelper.vertex_caching():
+            part = cq.Solid(CadHelper.import_brep_bytes(part_brep))
+            if is_reference:
+                return CanonicalPart(checksum=CadHelper.get_part_checksum(part))
+            return CadService.canonicalize_located_part(part, abs_location, normalize_axis)
+
+    @staticmethod
+    def canonicalize_located_part(part: cq.Solid, abs_location: Optional[Location], normalize_axis: bool):
+        aligned_part = part.located(Location.convert(abs_location).to_cq())
+        aligned_checksum = CadHelper.get_part_checksum(aligned_part) if normalize_axis else None
+        canonical_part = CadService.canonicalize_part(aligned_part, normalize_axis, aligned_checksum)
+        normalized_part = cast(cq.Solid, canonical_part.part)
+        canonical_part.checksum = CadHelper.get_part_checksum(normalized_part)
+        canonical_part.vertices = CadHelper.get_vertex_array(normalized_part)
+        canonical_part.part = None
+        return canonical_part
+
+    @staticmethod
+    def canonicalize_parts(cq_assembly: cq.Assembly, options: ProjectOptions, index: Optional[AssemblyIndex] = None):
+        """
+        Canonicalizes all leaf parts of the assembly in a process pool, results are merged in traversal order.
+        Parts placed as in the previous revision are resolved from the aligned refs of the index instead.
+        """
+        paths, part_breps, abs_locations, is_references = [], [], [], []
+        shape_keys: set[tuple[ShapeKey, bool]] = set()
+        canonical_parts: dict[AssemblyPath, CanonicalPart] = {}
+        for path, cq_subassembly, abs_location in CadService.get_leaf_parts(cq_assembly):
+            part = cast(cq.Solid, cast(cq.Workplane, cq_subassembly.obj).val())
+            is_reference = CadService.is_reference_part(cq_subassembly, options)
+
+            # repeated instances of a shape are resolved from the first one while merging
+            shape_key = (CadHelper.get_shape_key(part), is_reference)
+            if shape_key in shape_keys:
+                continue
+            shape_keys.add(shape_key)
+
+            part_abs_location = None if is_reference else Location.convert(cq_subassembly.loc).transform(abs_location)
+            if part_abs_location is not None and index is not None and options.normalize_axis and index.prev_project:
+                aligned_checksum = CadHelper.get_part_checksum(part.located(part_abs_location.to_cq()))
+                if CadService.is_aligned_ref_cached(aligned_checksum, index):
+                    canonical_parts[path] = CanonicalPart(aligned_checksum=aligned_checksum)
+                    continue
+
+            paths.append(path)
+            part_breps.append(CadHelper.export_brep_bytes(part.wrapped))
+            abs_locations.append(part_abs_location)
+            is_references.append(is_reference)
+
+        if not paths:
+            return canonical_parts
+        num_workers = min(options.num_workers, len(paths))
+        logger.info(f"Canonicalizing {len(paths)} parts with {num_workers} workers, {len(canonical_parts)} are cached")
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            results = executor.map(
+                CadService.canonicalize_part_brep,
+                part_breps,
+                abs_locations,
+                is_references,
+                [options.normalize_axis] * len(paths),
+                chunksize=max(1, len(paths) // (num_workers * 4)),
+            )
+            for path, canonical_part in zip(paths, results):
+                canonical_parts[path] = canonical_part
+        return canonical_parts
 
     @staticmethod
-    def get_referenced_part(cq_subassembly: cq.Assembly, assembly_path: str, inventory: Optional[Inventory] = None):
+    def get_referenced_part(
+        cq_subassembly: cq.Assembly, 
+        assembly_path: str, 
+        inventory: Optional[Inventory] = None, 
+        index: Optional[AssemblyIndex] = None,
+        canonical_part: Optional[CanonicalPart] = None
+    ):
         base_part = cast(cq.Solid, cast(cq.Workplane, cq_subassembly.obj).val())
-        part_checksum = CadHelper.get_part_checksum(base_part)
+        shape_key = CadHelper.get_shape_key(base_part)
+        if index and shape_key in index.reference_checksums:
+            part_checksum = index.reference_checksums[shape_key]
+        else:
+            part_checksum = canonical_part.checksum if canonical_part and canonical_part.checksum else CadHelper.get_part_checksum(base_part)
+            if index:
+                index.reference_checksums[shape_key] = part_checksum
         
-        part_color = list(CadHelper.rgba_float_to_int(cq_subassembly.color.toTuple())) if cq_subassembly.color else None
+        part_color = CadService.get_part_color(cq_subassembly)
         variation_id = inventory.find_variation_id(part_checksum, part_color) if inventory else 1
         location = Location.convert(cq_subassembly.loc)
         part_ref = PartRef(
@@ -422,7 +891,8 @@ class CadService:
         abs_location: Optional[Location] = None,
         inventory: Optional[Inventory] = None, 
         index: Optional[AssemblyIndex] = None, 
-        normalize_axis: bool = False
+        normalize_axis: bool = False,
+        canonical_part: Optional[CanonicalPart] = None,
     ):
         if index is None:
             index = AssemblyIndex()
@@ -430,95 +900,275 @@ class CadService:
         # TODO: check if this is correct
         part_rel_location = Location.convert(cq_subassembly.loc)
         part_abs_location = part_rel_location.transform(abs_location)
-        aligned_part = cast(cq.Solid, cast(cq.Workplane, cq_subassembly.obj).val()).located(part_abs_location.to_cq())
+        part = cast(cq.Solid, cast(cq.Workplane, cq_subassembly.obj).val())
+
+        # check if the shape has been placed before
+        shape_key = CadHelper.get_shape_key(part)
+        if shape_key in index.part_instances:
+            part_instance = index.part_instances[shape_key]
+            part_checksum = part_instance.checksum
+            variation_id = inventory.find_variation_id(part_checksum, CadService.get_part_color(cq_subassembly)) if inventory else 1
+            part_ref = PartRef(
+                path=f"{assembly_path}/{cq_subassembly.name}",
+                variation=InventoryVariationRef(
+                    checksum=part_checksum, 
+                    id=variation_id
+                ),
+                location=CadService.get_instance_location(part_instance, part_abs_location).relative_to(abs_location)
+            )
+            return part_instance.base_part, part_ref
+
+        aligned_part = part.located(part_abs_location.to_cq())
 
         # check if part has been aligned before
-        if normalize_axis:
+        if canonical_part is not None:
+            aligned_checksum = canonical_part.aligned_checksum
+        elif normalize_axis:
             aligned_checksum = CadHelper.get_part_checksum(aligned_part)
-            if index.prev_project and aligned_checksum in index.aligned_refs:
-                part_ref = index.aligned_refs[aligned_checksum]
-                base_part = index.prev_project.inventory.parts[part_ref.variation.checksum]
-                return base_part, part_ref
         else:
             # if not normalizing axis, then no need to check for aligned part, everything is already fast enough
             aligned_checksum = None
 
-        # otherwise align part and normalize
-        part_group = (
-            np.round(aligned_part.Area(), 3),
-            len(cast(Sized, aligned_part._entities("Vertex"))),
-        )
-        normalized_part, offset, rotmat = CadHelper.normalize_part(aligned_part, normalize_axis)
+        if CadService.is_aligned_ref_cached(aligned_checksum, index):
+            prev_project = cast(Project, index.prev_project)
+            aligned_ref = index.aligned_refs[cast(AlignedPartChecksum, aligned_checksum)]
+            part_checksum = aligned_ref.variation.checksum
+            base_part = prev_project.inventory.parts[part_checksum]
+            variation_id = inventory.find_variation_id(part_checksum, CadService.get_part_color(cq_subassembly)) if inventory else 1
+            part_ref = PartRef(
+                path=f"{assembly_path}/{cq_subassembly.name}",
+                variation=InventoryVariationRef(
+                    checksum=part_checksum, 
+                    id=variation_id
+                ),
+                location=Location.convert(aligned_ref.location).relative_to(abs_location)
+            )
+            index.part_instances[shape_key] = PartInstance(
+                base_part=base_part,
+                checksum=part_checksum,
+                abs_location=part_abs_location,
+                location=aligned_ref.location,
+            )
+            return base_part, part_ref
+
+        # otherwise align part and normalize, parts resolved from the aligned refs before the pool only have their aligned checksum
+        if canonical_part is None or canonical_part.part_group is None:
+            canonical_part = CadService.canonicalize_part(aligned_part, normalize_axis, aligned_checksum)
+        part_group = cast(PartGroup, canonical_part.part_group)
+        offset, rotmat = cast(np.ndarray, canonical_part.offset), cast(np.ndarray, canonical_part.rotmat)
         
-        # check if part has been normalized before
-        if part_group not in index.base_parts:
-            base_part = normalized_part
-            index.base_parts[part_group] = normalized_part
+        # check if part has been normalized before, in this or the previous revision
+        base_part = index.base_parts.get(part_group)
+        rot_mat_adjustment = None
+        if base_part is None:
+            base_part, rot_mat_adjustment = CadService.get_prev_base_part(part_group, canonical_part, index)
+
+        if base_part is None:
+            # parts canonicalized in a worker process are only rebuilt here, once per unique part
+            if canonical_part.part is not None:
+                base_part = canonical_part.part
+            else:
+                base_part = CadHelper.apply_normalization(aligned_part, offset, canonical_part.axis_rotmats)
+            part_checksum = canonical_part.checksum or CadHelper.get_part_checksum(base_part)
         else:
             # align part with previously normalized part (in case of symetric inertial axis)
-            base_part = index.base_parts[part_group]
-            rot_mat_adjustment = CadHelper.align_parts(base_part, normalized_part)
+            if rot_mat_adjustment is None:
+                rot_mat_adjustment = CadService.align_to_base_part(base_part, canonical_part)
             rotmat = rotmat.dot(rot_mat_adjustment)
-                    
-        part_checksum = CadHelper.get_part_checksum(base_part)
-        part_color = list(CadHelper.rgba_float_to_int(cq_subassembly.color.toTuple())) if cq_subassembly.color else None
+            part_checksum = index.base_part_checksums.get(part_group) or CadHelper.get_part_checksum(base_part)
+        index.base_parts[part_group] = base_part
+        index.base_part_checksums[part_group] = part_checksum
+
+        part_color = CadService.get_part_color(cq_subassembly)
         variation_id = inventory.find_variation_id(part_checksum, part_color) if inventory else 1
 
+        # placement of the base part in the frame of the root assembly, part references are relative to their assembly
+        part_location = Location(
+            position=offset,
+            orientation=rotmat,
+        )
         part_ref = PartRef(
             path=f"{assembly_path}/{cq_subassembly.name}",
             variation=InventoryVariationRef(
                 checksum=part_checksum, 
                 id=variation_id
             ),
-            location=Location(
-                position=offset,
-                orientation=rotmat,
-            )
+            location=part_location.relative_to(abs_location)
         )
 
         # assert alignment is correct
         # CadHelper.assert_correctly_aligned(base_part, aligned_part, rotmat, offset)
 
-        # cache aligned part
+        # cache aligned part, with its placement in the root frame since the aligned part is placed there
         if aligned_checksum:
-            index.aligned_refs[aligned_checksum] = part_ref
+            index.aligned_refs[aligned_checksum] = part_ref.model_copy(update={"location": part_location})
+
+        # cache the placement for other instances of the same shape
+        index.part_instances[shape_key] = PartInstance(
+            base_part=base_part,
+            checksum=part_checksum,
+            abs_location=part_abs_location,
+            location=part_location,
+        )
 
         return base_part, part_ref
 
     @staticmethod
-    def get_inventory_markdown(inventory: Inventory, project_path: Union[str, Path, None] = None):
-        md = "# Inventory\n"
-        data = []
+    def is_aligned_ref_cached(aligned_checksum: Optional[AlignedPartChecksum], index: AssemblyIndex):
+        """
+        Whether a part aligned the same way was placed in the previous revision and its base part is still in the inventory
+        """
+        if not aligned_checksum or not index.prev_project or aligned_checksum not in index.aligned_refs:
+            return False
+        return index.aligned_refs[aligned_checksum].variation.checksum in index.prev_project.inventory.catalog.items
+
+    @staticmethod
+    def align_to_base_part(base_part: cq.Solid, canonical_part: CanonicalPart):
+        if canonical_part.part is not None:
+            return CadHelper.align_parts(base_part, canonical_part.part)
+        return CadHelper.align_vertices(CadHelper.get_vertex_array(base_part), cast(np.ndarray, canonical_part.vertices))
+
+    @staticmethod
+    def get_prev_base_part(part_group: PartGroup, canonical_part: CanonicalPart, index: AssemblyIndex):
+        """
+        Base part of the previous revision for a part group and the rotation aligning the part to it, if any
+        """
+        prev_checksum = index.base_part_checksums.get(part_group)
+        if not index.prev_project or prev_checksum not in index.prev_project.inventory.catalog.items:
+            return None, None
+
+        prev_base_part = index.prev_project.inventory.parts[prev_checksum]
+        try:
+            return prev_base_part, CadService.align_to_base_part(prev_base_part, canonical_part)
+        except (AssertionError, ValueError):
+            # a different part with the same area and vertex count, start a new base part
+            return None, None
+
+    @staticmethod
+    def get_part_color(cq_subassembly: cq.Assembly):
+        return list(CadHelper.rgba_float_to_int(cq_subassembly.color.toTuple())) if cq_subassembly.color else None
+
+    @staticmethod
+    def get_instance_location(part_instance: PartInstance, abs_location: Location):
+        """
+        Location of the base part for another instance of the same shape placed at abs_location
+        """
+        first_abs_location = part_instance.abs_location
+        first_location = Location.convert(part_instance.location)
+        rotmat = abs_location.orientation.dot(first_abs_location.orientation.T)
+        return Location(
+            position=rotmat.dot(first_location.position - first_abs_location.position) + abs_location.position,
+            orientation=rotmat.dot(first_location.orientation),
+        )
+
+    @staticmethod
+    def get_inventory_rows(inventory: Inventory, project_path: Union[str, Path, None] = None, image_format: str = "svg"):
+        """
+        Rows of the inventory table, one per catalog item variation
+        """
         for catalog_item in inventory.catalog.items.values():
-            svg_path =  None
+            image_path =  None
             if project_path:
                 project_path = Path(project_path)
-                svg_path = (project_path / f"./assets/{catalog_item.name}.svg").relative_to(project_path)
+                image_path = (project_path / f"./assets/{catalog_item.name}.{image_format}").relative_to(project_path)
             for variation in catalog_item.variations:
                 color_str = ",".join(map(str, variation.color or [1,1,1]))
-                data_item = {
-                    "Part": "", 
-                    "Name": f"{catalog_item.name}", 
-                    "Variation": variation.id, 
-                    "Quantity": len(variation.references),
-                    "Color": f"<span style='color:rgb({color_str})'>&#9724;</span>", 
-                    "Price": f"${variation.metadata.price}" if variation.metadata and variation.metadata.price else  "-",
-                    "URL": variation.metadata.url if variation.metadata and variation.metadata.url else "-"
-                }
-                if svg_path and variation.id == 1:
-                    data_item["Part"] = f"![{catalog_item.name}-{variation.id}](../{svg_path})"
-                if variation.id > 1:
-                    data_item["Name"] = "\n"
-                data.append(data_item)
+                yield [
+                    f"![{catalog_item.name}-{variation.id}](../{image_path})" if image_path and variation.id == 1 else "",
+                    f"{catalog_item.name}" if variation.id == 1 else "",
+                    variation.id,
+                    len(variation.references),
+                    f"<span style='color:rgb({color_str})'>&#9724;</span>",
+                    f"${variation.metadata.price}" if variation.metadata and variation.metadata.price else  "-",
+                    variation.metadata.url if variation.metadata and variation.metadata.url else "-",
+                ]
+
+    @staticmethod
+    def write_markdown_table(f: TextIO, headers: list[str], rows: list[list[Union[str, int]]]):
+        """
+        Write a markdown pipe table, columns are padded and aligned like tabulate so diffs of the file stay readable
+        """
+        if not rows:
+            return
+        numeric = [all(isinstance(row[i], int) for row in rows) for i in range(len(headers))]
+        cells = [[str(value).strip() for value in row] for row in rows]
+        widths = [max(len(header) + 2, *(len(row[i]) for row in cells)) for i, header in enumerate(headers)]
+
+        def write_row(values: list[str]):
+            f.write("| " + " | ".join(
+                value.rjust(width) if is_numeric else value.ljust(width) 
+                for value, width, is_numeric in zip(values, widths, numeric)
+            ) + " |")
+
+        write_row(headers)
+        f.write("\n|" + "|".join("-" * (width + 1) + ":" if is_numeric else ":" + "-" * (width + 1) for width, is_numeric in zip(widths, numeric)) + "|")
+        for row in cells:
+            f.write("\n")
+            write_row(row)
+
+    @staticmethod
+    def get_inventory_markdown(inventory: Inventory, project_path: Union[str, Path, None] = None, image_format: str = "svg"):
+        stream = io.StringIO()
+        stream.write("# Inventory\n")
+        CadService.write_markdown_table(stream, INVENTORY_COLUMNS, list(CadService.get_inventory_rows(inventory, project_path, image_format)))
+        return stream.getvalue()
 
-        # Create a DataFrame
-        df = pd.DataFrame(data)
+    @staticmethod
+    def write_inventory_markdown(
+        inventory_path: Path, 
+        inventory: Inventory, 
+        project_path: Union[str, Path, None] = None, 
+        image_format: str = "svg",
+        page_size: int = INVENTORY_PAGE_SIZE
+    ):
+        """
+        Write inventory/README.md, catalogs with more than page_size variations are split into one page per
+        first letter of the part names, and letters with more than page_size variations into numbered pages
+        """
+        rows = list(CadService.get_inventory_rows(inventory, project_path, image_format))
+        pages: dict[str, list[list[Union[str, int]]]] = {}
+        if len(rows) > page_size:
+            letter_rows: dict[str, list[list[Union[str, int]]]] = {}
+            name = ""
+            for row in rows:
+                # variation rows follow the first row of their part
+                name = cast(str, row[1]) or name
+                letter = name[:1].lower() if name[:1].isalnum() else "other"
+                letter_rows.setdefault(letter, []).append(row)
+            for letter in sorted(letter_rows):
+                for page, start in enumerate(range(0, len(letter_rows[letter]), page_size)):
+                    pages[letter if page == 0 else f"{letter}_{page + 1}"] = letter_rows[letter][start:start + page_size]
+
+        with open(inventory_path / "README.md", "w") as f:
+            f.write("# Inventory\n")
+            if pages:
+                for page_name, page_rows in pages.items():
+                    f.write(f"- [{page_name}](README_{page_name}.md) ({len(page_rows)} variations)\n")
+            else:
+                CadService.write_markdown_table(f, INVENTORY_COLUMNS, rows)
+
+        for page_name, page_rows in pages.items():
+            with open(inventory_path / f"README_{page_name}.md", "w") as f:
+                f.write(f"# Inventory - {page_name}\n")
+                CadService.write_markdown_table(f, INVENTORY_COLUMNS, page_rows)
 
-        return md + df.to_markdown(index=False)
+        for page_path in inventory_path.glob("README_*.md"):
+            if page_path.stem.removeprefix("README_") not in pages:
+                page_path.unlink()
 
     @staticmethod
-    def write_inventory(project_path: Union[Path, str],inventory: Inventory, verbose=False):
+    def write_inventory(
+        project_path: Union[Path, str],
+        inventory: Inventory, 
+        verbose=False, 
+        options: Optional[ProjectOptions] = None, 
+        index: Optional[AssemblyIndex] = None
+    ):
+        """
+        Write the inventory incrementally, only part files that are new or changed are written and orphaned part files are removed
+        """
         logger.setLevel(logging.INFO if verbose else logging.ERROR)
+        options = options or ProjectOptions()
 
         project_path = Path(project_path)
         inventory_path = project_path / INVENTORY_DIRECTORY
@@ -526,21 +1176,70 @@ class CadService:
 
         logger.info(f"Writing inventory to {inventory_path}")
 
-        if project_path.is_dir() and inventory_path.is_dir():
-            shutil.rmtree(inventory_path)
         inventory_path.mkdir(parents=True, exist_ok=True)
         parts_path.mkdir(parents=True, exist_ok=True)
 
         # Generate BREP files for each part
-        for checksum, part in inventory.parts.items():
-            part_name = inventory.catalog.items[checksum].name
+        binary = options.part_format == "binary"
+        prev_items = index.prev_project.inventory.catalog.items if index and index.prev_project else {}
+        brep_paths = set()
+        for checksum, catalog_item in inventory.catalog.items.items():
+            part_name = catalog_item.name
             brep_path = parts_path / f"{part_name}.brep"
-            with open(brep_path, "w") as f:
-                CadHelper.export_brep(part.wrapped, f"{brep_path}")
+            brep_paths.add(brep_path)
+            brep_written = CadService.write_part_file(inventory, checksum, brep_path, binary, options, prev_items)
+            # parts can be unloaded once they are backed by their file
+            inventory.parts.register(checksum, brep_path, keep_loaded=True)
+            if brep_written:
                 logger.info(f"- Exported part '{part_name}'")
+        if inventory.parts.max_loaded is not None:
+            inventory.parts.evict(inventory.parts.max_loaded)
+
+        for brep_path in parts_path.glob("*.brep"):
+            if brep_path not in brep_paths:
+                brep_path.unlink()
+                logger.info(f"- Removed part file '{brep_path.name}'")
 
-        with open(inventory_path / "catalog.json", "w") as f:
-            f.write(inventory.catalog.model_dump_json(indent=4))
+        CadService.write_if_changed(inventory_path / "catalog.json", inventory.catalog.model_dump_json(indent=4))
+
+    @staticmethod
+    def write_part_file(
+        inventory: Inventory, 
+        checksum: PartChecksum, 
+        brep_path: Path, 
+        binary: bool, 
+        options: ProjectOptions, 
+        prev_items: dict[PartChecksum, CatalogItem],
+    ):
+        """
+        Write the BREP file of a part unless it already holds the part, returns whether the file was written
+        """
+        part_name = brep_path.stem
+
+        # the previous revision wrote the same part to the same file
+        if (
+            brep_path.is_file()
+            and checksum in prev_items and prev_items[checksum].name == part_name
+            and CadHelper.get_brep_format(brep_path) == (binary, options.compress_parts)
+        ):
+            return False
+
+        brep_data = CadHelper.export_brep_data(inventory.parts[checksum].wrapped, binary, options.compress_parts)
+        if brep_path.is_file() and brep_path.read_bytes() == brep_data:
+            return False
+        brep_path.write_bytes(brep_data)
+        return True
+
+    @staticmethod
+    def write_if_changed(file_path: Path, content: str):
+        """
+        Write a text file unless it already has the same content, returns whether the file was written
+        """
+        if file_path.is_file() and file_path.read_text() == content:
+            return False
+        with open(file_path, "w") as f:
+            f.write(content)
+        return True
 
     @staticmethod
     def write_assets(project_path: Union[Path, str], project: Project, index: Optional[AssemblyIndex] = None, verbose=False):
@@ -554,45 +1253,108 @@ class CadService:
 
         logger.info(f"Writing assets to {project_path}")
 
-        # Generate SVGs for each part if they are modified or don't exist
-        part_names = set()
-        part_svg_options = SVGOptions(showAxes=False, marginLeft=20)
-        # part_svg_options = {"showAxes": False, "marginLeft": 20}
-        for checksum, catalog_item in project.inventory.catalog.items.items():
-            part = project.inventory.parts[checksum]
-            part_names.add(catalog_item.name)
-            svg_path = assets_path / f"{catalog_item.name}.svg"
-            if not index or index and checksum in index.is_part_modified or not svg_path.exists():
-                logger.info(f"- Generating SVG for part '{catalog_item.name}'")
-                svg = AssetHelper.getSVG(part, part_svg_options)
-                # svg = getSVG(part, part_svg_options)
+        # thumbnails are rendered into a content addressed cache and copied to the assets
+        image_format = project.options.thumbnail_format
+        image_cache_path = project_path / CACHE_DIRECTORY / image_format
+        image_cache_path.mkdir(parents=True, exist_ok=True)
+        image_jobs: list[tuple[str, Path, Union[cq.Shape, cq.Assembly, Path], Union[SVGOptions, PNGOptions]]] = []
+        image_copies: list[tuple[Path, Path]] = []
+
+        part_image_options: Union[SVGOptions, PNGOptions]
+        assembly_image_options: Union[SVGOptions, PNGOptions]
+        if image_format == "png":
+            part_image_options = assembly_image_options = PNGOptions()
+        else:
+            hlr_options = dict(
+                hlrMode=project.options.svg_hlr_mode, 
+                deflection=project.options.svg_deflection, 
+                precision=2, 
+                simplifyTolerance=0.1
+            )
+            part_image_options = SVGOptions(showAxes=False, marginLeft=20, **hlr_options)
+            # part_svg_options = {"showAxes": False, "marginLeft": 20}
+            assembly_image_options = SVGOptions(showAxes=False, marginLeft=20, showHidden=False, strokeWidth=-0.9, **hlr_options)
+            # assembly_svg_options = {"showAxes": False, "marginLeft": 20, "showHidden": False, "strokeWidth": -0.9}
 
-                with open(svg_path, "w") as f:
-                    f.write(svg)
+        # Generate thumbnails for each part that is not cached
+        for checksum, catalog_item in project.inventory.catalog.items.items():
+            cached_image_path = image_cache_path / f"{AssetHelper.get_asset_cache_key(checksum, part_image_options)}.{image_format}"
+            image_copies.append((cached_image_path, assets_path / f"{catalog_item.name}.{image_format}"))
+            if not cached_image_path.exists():
+                # parts that are not loaded are rendered from their file, one at a time
+                parts = project.inventory.parts
+                part = parts.solids[checksum] if parts.is_loaded(checksum) else cast(Path, parts.paths[checksum])
+                image_jobs.append((f"part '{catalog_item.name}'", cached_image_path, part, part_image_options))
+
+        # Generate thumbnail for root assembly, keyed by the content of all the assemblies and the part colors
+        assemblies_checksum = hashlib.md5()
+        for assembly_path in sorted(project.assemblies):
+            assemblies_checksum.update(project.assemblies[assembly_path].model_dump_json().encode())
+        for checksum in sorted(project.inventory.catalog.items):
+            for variation in project.inventory.catalog.items[checksum].variations:
+                assemblies_checksum.update(f"{checksum}:{variation.id}:{variation.color}".encode())
+        cached_image_path = image_cache_path / f"{AssetHelper.get_asset_cache_key(assemblies_checksum.hexdigest(), assembly_image_options)}.{image_format}"
+        image_copies.append((cached_image_path, assets_path / f"{project.root_assembly.long_name}.{image_format}"))
+        if not cached_image_path.exists():
+            root_assembly_cq = project.root_assembly.to_cq(project)
+            image_jobs.append((f"root assembly '{project.root_assembly.name}'", cached_image_path, root_assembly_cq, assembly_image_options))
 
+        CadService.write_images(image_jobs, project.options.num_workers)
+        for cached_image_path, image_path in image_copies:
+            if not image_path.exists() or image_path.read_bytes() != cached_image_path.read_bytes():
+                shutil.copyfile(cached_image_path, image_path)
 
         # Generate assets for main assembly
-        with open(inventory_path / "README.md", "w") as f:
-            inventory_md = CadService.get_inventory_markdown(project.inventory, assets_path)
-            f.write(inventory_md)
+        CadService.write_inventory_markdown(inventory_path, project.inventory, assets_path, image_format)
 
-        # Generate SVG for root assembly
-        root_assembly_svg_path = assets_path / f"{project.root_assembly.long_name}.svg"
-        if not index or index and project.root_assembly.path in index.is_assembly_modified or not root_assembly_svg_path.exists():
-            logger.info(f"- Generating SVG for root assembly '{project.root_assembly.name}', this may take a sec ...")
-            root_assembly_cq = project.root_assembly.to_cq(project)
-            assembly_svg_options = SVGOptions(showAxes=False, marginLeft=20, showHidden=False, strokeWidth=-0.9)
-            # assembly_svg_options = {"showAxes": False, "marginLeft": 20, "showHidden": False, "strokeWidth": -0.9}
-            root_assembly_svg = AssetHelper.getSVG(root_assembly_cq, assembly_svg_options)
-            # root_assembly_svg = getSVG(root_assembly_cq.toCompound(), assembly_svg_options)
+        logger.info("\n\n- Removing thumbnails not in inventory")
+        image_paths = {image_path for _, image_path in image_copies}
+        for image_path in [*assets_path.glob("*.svg"), *assets_path.glob("*.png")]:
+            if image_path not in image_paths:
+                image_path.unlink()
 
-            with open(root_assembly_svg_path, "w") as f:
-                f.write(root_assembly_svg)
+        # Remove cached thumbnails of previous revisions and of the other thumbnail format
+        cached_image_paths = {cached_image_path for cached_image_path, _ in image_copies}
+        for cached_format in ("svg", "png"):
+            for cached_image_path in (project_path / CACHE_DIRECTORY / cached_format).glob(f"*.{cached_format}"):
+                if cached_image_path not in cached_image_paths:
+                    cached_image_path.unlink()
 
-        logger.info("\n\n- Removing SVG files not in inventory")
-        for svg_path in assets_path.glob("*.svg"):
-            if svg_path.stem not in part_names and svg_path != root_assembly_svg_path:
-                svg_path.unlink()
+    @staticmethod
+    def write_images(image_jobs: list[tuple[str, Path, Union[cq.Shape, cq.Assembly, Path], Union[SVGOptions, PNGOptions]]], workers: int = 1):
+        """
+        Render and write SVG or PNG thumbnails, in a process pool when workers > 1 where each worker writes its file directly.
+        Shapes given as a BREP file path are loaded when they are rendered.
+        """
+        if workers <= 1 or len(image_jobs) <= 1:
+            for name, image_path, shape, image_options in image_jobs:
+                logger.info(f"- Generating {image_path.suffix} for {name}")
+                if isinstance(shape, Path):
+                    shape = cq.Shape.cast(CadHelper.import_brep(shape))
+                AssetHelper.exportAsset(shape, image_path, image_options)
+            return
+
+        workers = min(workers, len(image_jobs))
+        logger.info(f"Generating {len(image_jobs)} thumbnails with {workers} workers")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for name, image_path, shape, image_options in image_jobs:
+                # file backed parts are loaded by the workers, loaded parts are sent as binary BREP
+                if isinstance(shape, Path):
+                    futures[executor.submit(AssetHelper.exportAsset_brep, shape, image_path, image_options)] = name
+                elif isinstance(shape, cq.Shape):
+                    future = executor.submit(AssetHelper.exportAsset_brep, CadHelper.export_brep_bytes(shape.wrapped), image_path, image_options)
+                    futures[future] = name
+
+            # assemblies are rendered here while the pool works through the parts
+            for name, image_path, shape, image_options in image_jobs:
+                if isinstance(shape, cq.Assembly):
+                    logger.info(f"- Generating {image_path.suffix} for {name}")
+                    AssetHelper.exportAsset(shape, image_path, image_options)
+
+            for future in as_completed(futures):
+                future.result()
+                logger.info(f"- Generated thumbnail for {futures[future]}")
 
 
 
@@ -605,17 +1367,26 @@ class CadService:
 
         logger.info(f"Writing assemblies to {assembly_path}")
 
-        # delete directory path
-        if project_path.is_dir() and assembly_path.is_dir():
-                shutil.rmtree(assembly_path)
         assembly_path.mkdir(parents=True, exist_ok=True)
 
-        # Generate assembly files
+        # Generate assembly files, only the ones that differ from disk are written
+        assembly_files = set()
         for assembly in project.assemblies.values():
             subassembly_path = assembly_path / assembly.path.lstrip("/")
             subassembly_path.mkdir(parents=True, exist_ok=True)
-            with open(subassembly_path / "assembly.json", "w") as f:
-                f.write(assembly.model_dump_json(indent=4))
+            assembly_file = subassembly_path / "assembly.json"
+            assembly_files.add(assembly_file)
+            if CadService.write_if_changed(assembly_file, assembly.model_dump_json(indent=4)):
+                logger.info(f"- Wrote assembly '{assembly.path}'")
+
+        # Remove deleted subassemblies
+        for assembly_file in assembly_path.rglob("assembly.json"):
+            if assembly_file not in assembly_files:
+                assembly_file.unlink()
+                logger.info(f"- Removed assembly '{assembly_file.parent.relative_to(assembly_path)}'")
+        for directory in sorted(assembly_path.rglob("*"), key=lambda path: len(path.parts), reverse=True):
+            if directory.is_dir() and not any(directory.iterdir()):
+                directory.rmdir()
     
 
     # TODO: start breaking the function into smaller parts
@@ -629,11 +1400,13 @@ class CadService:
 
         # Write inventory
         logger.info(f"\n\n")
-        CadService.write_inventory(project_path, project.inventory, verbose)
+        project.inventory.parts.max_loaded = project.options.max_loaded_parts
+        CadService.write_inventory(project_path, project.inventory, verbose, project.options, index)
 
         # Write assemblies
         logger.info(f"\n\n")
         CadService.write_assemblies(project_path, project, verbose)
+        CadService.write_manifest(project_path, project)
 
         # Write assets
         if project.options.include_assets:
@@ -649,15 +1422,19 @@ class CadService:
         verbose=False
     ):
         project = Project()
+        index = AssemblyIndex()
         if project_options:
             project.options = project_options
         if cad_file:
             # Create the new directory
             logger.info(f"\n\nLoading in step file {cad_file}")
             cq_assembly = CadHelper.import_cad(cad_file)
-            CadService.read_cq_assembly(cq_assembly, project)
+            CadService.read_cq_assembly(cq_assembly, project, index)
         if project_path:
             CadService.write_project(project_path, project, verbose=verbose)
+            CadService.write_index(project_path, project, index)
+            if cad_file:
+                CadService.write_source(project_path, cad_file, project.options)
         return project
 
     @staticmethod
@@ -665,69 +1442,527 @@ class CadService:
         logger.setLevel(logging.INFO if verbose else logging.ERROR)
 
         prev_project = CadService.read_project(project_path)
+        is_outdated = prev_project.format_version < ASSEMBLY_FORMAT_VERSION
+        if not is_outdated and CadService.is_source_unchanged(project_path, cad_path, project_options or ProjectOptions()):
+            logger.info(f"CAD file {cad_path} and options are unchanged, skipping revision")
+            prev_project.options = project_options or ProjectOptions()
+            return prev_project
 
         cq_assembly = CadHelper.import_step(cad_path)
 
         revised_project = Project()
         if project_options:
             revised_project.options = project_options
-        index = AssemblyIndex(prev_project=prev_project)
+        if is_outdated:
+            # cached placements of an older format are not reused, every part is placed again
+            logger.info(f"Revising every part of {project_path}, its assemblies are in format {prev_project.format_version}")
+            index = AssemblyIndex(prev_project=prev_project)
+        else:
+            index = CadService.read_index(project_path, prev_project, revised_project.options)
         CadService.read_cq_assembly(cq_assembly, revised_project, index)
 
         if write:
             CadService.write_project(project_path, revised_project, index, verbose=verbose)
+            CadService.write_index(project_path, revised_project, index)
+            CadService.write_source(project_path, cad_path, revised_project.options)
         
         return revised_project
 
     @staticmethod
-    def read_project(project_path: Union[Path, str]):
+    def get_catalog_checksum(project_path: Path):
+        catalog_path = project_path / INVENTORY_DIRECTORY / "catalog.json"
+        return hashlib.md5(catalog_path.read_bytes()).hexdigest() if catalog_path.is_file() else None
+
+    @staticmethod
+    def write_index(project_path: Union[Path, str], project: Project, index: AssemblyIndex):
+        """
+        Persist the caches of the index so the next revision can skip unchanged parts
+        """
+        project_path = Path(project_path)
+        catalog_checksum = CadService.get_catalog_checksum(project_path)
+        if catalog_checksum is None:
+            return
+
+        items = project.inventory.catalog.items
+        index_cache = AssemblyIndexCache(
+            catalog_checksum=catalog_checksum,
+            normalize_axis=project.options.normalize_axis,
+            base_parts=[
+                BasePartEntry(area=area, num_vertices=num_vertices, checksum=checksum)
+                for (area, num_vertices), checksum in index.base_part_checksums.items()
+                if checksum in items
+            ],
+            aligned_refs={
+                aligned_checksum: part_ref
+                for aligned_checksum, part_ref in index.aligned_refs.items()
+                if part_ref.variation.checksum in items
+            },
+        )
+        cache_path = project_path / CACHE_DIRECTORY
+        cache_path.mkdir(parents=True, exist_ok=True)
+        with open(cache_path / ASSEMBLY_INDEX_CACHE_FILE, "w") as f:
+            f.write(index_cache.model_dump_json())
+
+    @staticmethod
+    def read_index(project_path: Union[Path, str], prev_project: Optional[Project] = None, options: Optional[ProjectOptions] = None):
+        """
+        Read the index persisted by write_index, an empty index is returned if it is missing or stale
+        """
+        project_path = Path(project_path)
+        index = AssemblyIndex(prev_project=prev_project)
+        index_cache_path = project_path / CACHE_DIRECTORY / ASSEMBLY_INDEX_CACHE_FILE
+        if not index_cache_path.is_file():
+            return index
+
+        try:
+            index_cache = AssemblyIndexCache.model_validate_json(index_cache_path.read_text())
+        except ValueError:
+            logger.info(f"Ignoring unreadable index cache {index_cache_path}")
+            return index
+
+        normalize_axis = options is not None and options.normalize_axis
+        if (
+            index_cache.version != ASSEMBLY_INDEX_CACHE_VERSION
+            or index_cache.normalize_axis != normalize_axis
+            or index_cache.catalog_checksum != CadService.get_catalog_checksum(project_path)
+        ):
+            logger.info(f"Ignoring stale index cache {index_cache_path}")
+            return index
+
+        index.base_part_checksums = {
+            (entry.area, entry.num_vertices): entry.checksum for entry in index_cache.base_parts
+        }
+        index.aligned_refs = index_cache.aligned_refs
+        return index
+
+    @staticmethod
+    def write_source(project_path: Union[Path, str], cad_path: Union[Path, str], options: ProjectOptions):
+        """
+        Record the CAD file contents and options the project was written from
+        """
+        project_path = Path(project_path)
+        try:
+            signature = CadService.get_source_signature(project_path)
+        except FileNotFoundError:
+            return
+
+        project_source = ProjectSource(
+            cad_checksum=CadHelper.get_file_checksum(cad_path),
+            signature=signature,
+            options=options,
+        )
+        cache_path = project_path / CACHE_DIRECTORY
+        cache_path.mkdir(parents=True, exist_ok=True)
+        with open(cache_path / PROJECT_SOURCE_FILE, "w") as f:
+            f.write(project_source.model_dump_json(indent=4))
+
+    @staticmethod
+    def is_source_unchanged(project_path: Union[Path, str], cad_path: Union[Path, str], options: ProjectOptions):
+        """
+        Whether the project was last written from the same CAD file contents and options, and its catalog,
+        assembly and part files are not modified since
+        """
+        project_path = Path(project_path)
+        source_path = project_path / CACHE_DIRECTORY / PROJECT_SOURCE_FILE
+        if not source_path.is_file():
+            return False
+
+        try:
+            project_source = ProjectSource.model_validate_json(source_path.read_text())
+            signature = CadService.get_source_signature(project_path)
+        except (ValueError, FileNotFoundError):
+            return False
+
+        # the number of workers does not change the output
+        return (
+            project_source.options.model_dump(exclude={"workers"}) == options.model_dump(exclude={"workers"})
+            and project_source.signature == signature
+            and project_source.cad_checksum == CadHelper.get_file_checksum(cad_path)
+        )
+
+    @staticmethod
+    def migrate_parts(project_path: Union[Path, str], options: ProjectOptions, verbose=False):
+        """
+        Rewrite the inventory part files of an existing project in the part format of the options
+        """
+        logger.setLevel(logging.INFO if verbose else logging.ERROR)
+
+        project_path = Path(project_path)
+        project = CadService.read_project(project_path)
+        parts_path = project_path / PARTS_DIRECTORY
+
+        logger.info(f"Migrating parts in {parts_path} to {options.part_format} BREP{' (compressed)' if options.compress_parts else ''}")
+        for checksum, catalog_item in project.inventory.catalog.items.items():
+            part = project.inventory.parts[checksum]
+            brep_path = parts_path / f"{catalog_item.name}.brep"
+            CadHelper.export_brep(part.wrapped, f"{brep_path}", options.part_format == "binary", options.compress_parts)
+            project.inventory.parts.evict()
+            logger.info(f"- Migrated part '{catalog_item.name}'")
+
+        # keep the unchanged revision check valid for the new options
+        source_path = project_path / CACHE_DIRECTORY / PROJECT_SOURCE_FILE
+        if source_path.is_file():
+            try:
+                project_source = ProjectSource.model_validate_json(source_path.read_text())
+            except ValueError:
+                return
+            project_source.options = options
+            project_source.signature = CadService.get_source_signature(project_path)
+            source_path.write_text(project_source.model_dump_json(indent=4))
+
+    @staticmethod
+    def get_assembly_files(assembly_path: Path) -> Iterator[tuple[Path, os.stat_result]]:
+        """
+        Yields the assembly.json files with their stats, parents before children and siblings sorted by name.
+        Stats come from the directory listing, which needs no extra calls on Windows.
+        """
+        try:
+            entries = sorted(os.scandir(assembly_path), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name == "assembly.json" and entry.is_file():
+                yield Path(entry.path), entry.stat()
+        for entry in entries:
+            if entry.is_dir():
+                yield from CadService.get_assembly_files(Path(entry.path))
+
+    @staticmethod
+    def get_project_signature(project_path: Path, assembly_files: list[tuple[Path, os.stat_result]]):
+        """
+        Signature of the catalog from its content and of the assembly files from their paths and stats.
+        The inode and change time are included since the modification time can be restored, for example by a checkout.
+        """
+        catalog_checksum = CadService.get_catalog_checksum(project_path)
+        if catalog_checksum is None:
+            raise FileNotFoundError(project_path / INVENTORY_DIRECTORY / "catalog.json")
+        signature = hashlib.md5(f"catalog.json:{catalog_checksum}".encode())
+        for assembly_file, stat in assembly_files:
+            signature.update(
+                f"\n{assembly_file.relative_to(project_path).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}:{stat.st_ctime_ns}".encode()
+            )
+        return signature.hexdigest()
+
+    @staticmethod
+    def get_source_signature(project_path: Path):
+        """
+        Signature of the catalog and assembly files as in get_project_signature, and of the part files from their names and stats
+        """
+        assembly_files = list(CadService.get_assembly_files(project_path / ASSEMBLY_DIRECTORY))
+        signature = hashlib.md5(CadService.get_project_signature(project_path, assembly_files).encode())
+        parts_path = project_path / PARTS_DIRECTORY
+        part_entries = sorted(os.scandir(parts_path), key=lambda entry: entry.name) if parts_path.is_dir() else []
+        for entry in part_entries:
+            stat = entry.stat()
+            signature.update(f"\n{PARTS_DIRECTORY}/{entry.name}:{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}:{stat.st_ctime_ns}".encode())
+        return signature.hexdigest()
+
+    @staticmethod
+    def write_manifest(project_path: Union[Path, str], project: Project, signature: Optional[str] = None):
+        """
+        Write the catalog and assemblies to a single manifest so the next read_project is one file read
+        """
+        project_path = Path(project_path)
+        if signature is None:
+            assembly_files = list(CadService.get_assembly_files(project_path / ASSEMBLY_DIRECTORY))
+            signature = CadService.get_project_signature(project_path, assembly_files)
+        manifest = ProjectManifest(
+            signature=signature,
+            catalog=project.inventory.catalog,
+            assemblies=list(project.assemblies.values()),
+        )
+        cache_path = project_path / CACHE_DIRECTORY
+        cache_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path / f"{PROJECT_MANIFEST_FILE}.tmp"
+        tmp_path.write_text(manifest.model_dump_json())
+        os.replace(tmp_path, cache_path / PROJECT_MANIFEST_FILE)
+
+    @staticmethod
+    def read_manifest(project_path: Union[Path, str], signature: str) -> Optional[ProjectManifest]:
+        """
+        Read the manifest written by write_manifest, None if it is missing or stale
+        """
+        manifest_path = Path(project_path) / CACHE_DIRECTORY / PROJECT_MANIFEST_FILE
+        if not manifest_path.is_file():
+            return None
+
+        try:
+            manifest = ProjectManifest.model_validate_json(manifest_path.read_bytes())
+        except ValueError:
+            logger.info(f"Ignoring unreadable project manifest {manifest_path}")
+            return None
+
+        if manifest.version != PROJECT_MANIFEST_VERSION or manifest.signature != signature:
+            logger.info(f"Ignoring stale project manifest {manifest_path}")
+            return None
+        return manifest
+
+    @staticmethod
+    def read_project(project_path: Union[Path, str], use_manifest: bool = True):
+        """
+        Read a project, from the manifest in the cache when the catalog and assembly files are unchanged,
+        otherwise from the files after which the manifest is rewritten
+        """
         project = Project()
 
         project_path = Path(project_path)
         assert project_path.is_dir(), f"Project directory not found: {project_path}"
         inventory_path = project_path / INVENTORY_DIRECTORY
         parts_path = inventory_path / "parts"
-
-        with open(inventory_path / "catalog.json", "r") as f:
-            catalog = InventoryCatalog.model_validate_json(f.read())
-            for checksum, catalog_item in catalog.items.items():
-                catalog_item = CatalogItem.model_validate(catalog_item)
-                brep_path = parts_path / f"{catalog_item.name}.brep"
-                project.inventory.parts[checksum] = cq.Solid(
-                    CadHelper.import_brep(brep_path)
-                )
-                project.inventory.catalog.items[checksum] = catalog_item
-
         assembly_path = project_path / ASSEMBLY_DIRECTORY
 
-        for assembly_file_path in assembly_path.rglob("assembly.json"):
-            if assembly_file_path.is_file():
+        assembly_files = list(CadService.get_assembly_files(assembly_path))
+        signature = CadService.get_project_signature(project_path, assembly_files) if use_manifest else None
+        manifest = CadService.read_manifest(project_path, signature) if signature else None
+
+        if manifest:
+            catalog = manifest.catalog
+            assemblies = manifest.assemblies
+        else:
+            with open(inventory_path / "catalog.json", "r") as f:
+                catalog = InventoryCatalog.model_validate_json(f.read())
+            assemblies = []
+            for assembly_file_path, _ in assembly_files:
                 with open(assembly_file_path, "r") as f:
-                    assembly = Assembly.model_validate_json(f.read())
-                    project.assemblies[assembly.path] = assembly
-                    for part_ref in assembly.parts:
-                        project.part_refs[part_ref.path] = part_ref
+                    assemblies.append(Assembly.model_validate_json(f.read()))
+
+        for checksum, catalog_item in catalog.items.items():
+            catalog_item = CatalogItem.model_validate(catalog_item)
+            brep_path = parts_path / f"{catalog_item.name}.brep"
+            project.inventory.parts.register(checksum, brep_path)
+            project.inventory.catalog.items[checksum] = catalog_item
+
+        for assembly in assemblies:
+            project.assemblies[assembly.path] = assembly
+            for part_ref in assembly.parts:
+                project.part_refs[part_ref.path] = part_ref
+
+        project.format_version = min(map(CadService.get_assembly_format_version, assemblies), default=ASSEMBLY_FORMAT_VERSION)
+        if project.format_version < ASSEMBLY_FORMAT_VERSION:
+            logger.warning(f"Assemblies of {project_path} are in format {project.format_version}, part placements are only correct after a revision")
+
+        if signature and not manifest:
+            try:
+                CadService.write_manifest(project_path, project, signature)
+            except OSError as e:
+                logger.info(f"Could not write the project manifest: {e}")
 
         return project
 
     @staticmethod
-    def visualize_project(project_path: Union[Path, str], remote_viewer=False, export_html=True, auto_open=True, verbose=True):
-        logger.setLevel(logging.INFO if verbose else logging.ERROR)
+    def get_assembly_format_version(assembly: Assembly):
+        """
+        Format of an assembly read from a file, files written before the format was versioned have none
+        """
+        return assembly.version if "version" in assembly.model_fields_set else 1
+
+    @staticmethod
+    def get_part_instances(project: Project, transforms: Optional[TransformTable] = None) -> Iterator[tuple[PartRef, np.ndarray]]:
+        """
+        Yields every part reference of the project with its absolute 4x4 transform, composed like Assembly.to_cq
+        """
+        transforms = transforms or project.get_transform_table()
+        for part_path, matrix in zip(transforms.part_paths, transforms.get_part_world_matrices()):
+            yield project.part_refs[part_path], matrix
+
+    @staticmethod
+    def get_part_meshes(
+        project: Project, 
+        checksums: Iterable[PartChecksum], 
+        cache_path: Union[Path, str, None] = None, 
+        workers: int = 1, 
+        lod: MeshLod = "fine",
+    ):
+        """
+        Tessellates each part once, meshes are read from and saved to the tessellation store when a cache path is given
+        """
+        store = TessellationStore(cache_path) if cache_path else None
+        deviation, angular_tolerance = MESH_LODS[lod]
+        keys = {checksum: ((checksum,), "mesh", deviation, angular_tolerance) for checksum in checksums}
+        meshes: dict[PartChecksum, dict[str, np.ndarray]] = {}
+        missing = []
+        for checksum, key in keys.items():
+            if store is not None and key in store:
+                meshes[checksum] = store[key]
+            else:
+                missing.append(checksum)
+
+        if not missing:
+            return meshes
+
+        logger.info(f"Tessellating {len(missing)} of {len(keys)} parts at {lod} quality with {workers} workers, the others are cached")
+        parts = project.inventory.parts
+        # file backed parts are read by the workers themselves
+        shapes = {
+            keys[checksum]: parts.solids[checksum] if parts.is_loaded(checksum) else cast(Path, parts.paths[checksum])
+            for checksum in missing
+        }
+        tessellated = CadHelper.tesselate_shapes(shapes, store, workers, deviation, angular_tolerance)
+        for checksum in missing:
+            meshes[checksum] = tessellated[keys[checksum]]
+        return meshes
+
+    @staticmethod
+    def get_part_lods(project: Project, coarse_meshes: dict[PartChecksum, dict[str, np.ndarray]]) -> dict[PartChecksum, MeshLod]:
+        """
+        Tessellation tier of each part from its size relative to the bounding box of the root assembly,
+        sizes are taken from the coarse meshes
+        """
+        transforms = project.get_transform_table()
+        part_checksums = [project.part_refs[part_path].variation.checksum for part_path in transforms.part_paths]
+
+        unique_checksums = list(dict.fromkeys(part_checksums))
+        checksum_ids = {checksum: i for i, checksum in enumerate(unique_checksums)}
+        # (U, 2, 3) lower and upper bounds of each part, nan for empty meshes
+        part_bounds = np.full((len(unique_checksums), 2, 3), np.nan)
+        for i, checksum in enumerate(unique_checksums):
+            vertices = np.asarray(coarse_meshes[checksum]["vertices"], dtype=np.float64).reshape(-1, 3)
+            if len(vertices):
+                part_bounds[i] = vertices.min(axis=0), vertices.max(axis=0)
+        part_sizes = dict(zip(unique_checksums, np.nan_to_num(np.linalg.norm(part_bounds[:, 1] - part_bounds[:, 0], axis=1)).tolist()))
+
+        # corners of the part bounding boxes placed at every instance
+        instance_bounds = part_bounds[np.array([checksum_ids[checksum] for checksum in part_checksums], dtype=np.int64)]
+        corner_selection = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)])
+        corners = instance_bounds[:, corner_selection, [0, 1, 2]]
+        world_matrices = transforms.get_part_world_matrices()
+        world_corners = np.einsum("nij,ncj->nci", world_matrices[:, :3, :3], corners) + world_matrices[:, None, :3, 3]
+        if np.isnan(world_corners).all():
+            lower = upper = np.zeros(3)
+        else:
+            lower, upper = np.nanmin(world_corners, axis=(0, 1)), np.nanmax(world_corners, axis=(0, 1))
+
+        root_size = float(np.linalg.norm(upper - lower))
+        lods: dict[PartChecksum, MeshLod] = {}
+        for checksum in coarse_meshes:
+            relative_size = part_sizes.get(checksum, 0.0) / root_size if root_size else 1.0
+            lods[checksum] = next((lod for lod, threshold in MESH_LOD_THRESHOLDS.items() if relative_size >= threshold), "coarse")
+        return lods
+
+    @staticmethod
+    def get_lod_meshes(project: Project, checksums: Iterable[PartChecksum], cache_path: Union[Path, str, None] = None, workers: int = 1):
+        """
+        Meshes of the parts at the tier picked for their size, large parts are fine and small parts coarse
+        """
+        meshes = CadService.get_part_meshes(project, checksums, cache_path, workers, "coarse")
+        lods = CadService.get_part_lods(project, meshes)
+        for lod in MESH_LOD_THRESHOLDS:
+            lod_checksums = [checksum for checksum in meshes if lods[checksum] == lod]
+            logger.info(f"Using {lod} meshes for {len(lod_checksums)} parts")
+            meshes.update(CadService.get_part_meshes(project, lod_checksums, cache_path, workers, lod))
+        return meshes
+
+    @staticmethod
+    def get_display_scene(project: Project, cache_path: Union[Path, str, None] = None, workers: int = 1, lod: bool = True):
+        """
+        Instanced scene of the project, each part mesh is included once and referenced by groups of
+        instance transforms with the same part and color
+        """
+        transforms = project.get_transform_table()
+        groups: dict[tuple[PartChecksum, tuple], list[int]] = {}
+        for part_id, part_path in enumerate(transforms.part_paths):
+            part_ref = project.part_refs[part_path]
+            color = tuple(project.inventory.get_variation(part_ref.variation).color or ())
+            groups.setdefault((part_ref.variation.checksum, color), []).append(part_id)
+        world_matrices = transforms.get_part_world_matrices()
+
+        checksums = dict.fromkeys(checksum for checksum, _ in groups)
+        if lod:
+            meshes = CadService.get_lod_meshes(project, checksums, cache_path, workers)
+        else:
+            meshes = CadService.get_part_meshes(project, checksums, cache_path, workers)
+
+        def encode(array: np.ndarray):
+            return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode()
+
+        return {
+            "meshes": {
+                checksum: {name: encode(array) for name, array in mesh.items()}
+                for checksum, mesh in meshes.items()
+            },
+            "groups": [
+                {
+                    "mesh": checksum,
+                    "color": CadHelper.rgba_int_to_float(color)[:3] if color else DEFAULT_PART_COLOR,
+                    "alpha": color[3] if len(color) > 3 else 1.0,
+                    # the viewer reads matrices column major like WebGL
+                    "matrices": encode(world_matrices[part_ids].transpose(0, 2, 1).astype(np.float32)),
+                }
+                for (checksum, color), part_ids in groups.items()
+            ],
+        }
+
+    @staticmethod
+    def export_display_html(project: Project, html_path: Union[Path, str], cache_path: Union[Path, str, None] = None, workers: int = 1, lod: bool = True):
+        scene = CadService.get_display_scene(project, cache_path, workers, lod)
+        html = VIEWER_TEMPLATE.replace("__TITLE__", project.root_assembly.name).replace("__SCENE__", json.dumps(scene))
+        Path(html_path).write_text(html)
+
+    @staticmethod
+    def get_gltf_node(project: Project, assembly: Optional[Assembly] = None) -> GltfNode:
+        """
+        Scene node of the assembly, subassemblies and part references keep their relative locations
+        """
+        assembly = assembly or project.root_assembly
+        node = GltfNode(name=assembly.name)
+        for subassembly_path in assembly.children:
+            subassembly = project.assemblies[subassembly_path]
+            subassembly_node = CadService.get_gltf_node(project, subassembly)
+            subassembly_node.matrix = Location.convert(subassembly.location).to_matrix()
+            node.children.append(subassembly_node)
+        for part_ref in assembly.parts:
+            color = project.inventory.get_variation(part_ref.variation).color
+            node.children.append(GltfNode(
+                name=part_ref.name,
+                matrix=Location.convert(part_ref.location).to_matrix(),
+                mesh=(part_ref.variation.checksum, CadHelper.rgba_int_to_float(color) if color else DEFAULT_PART_COLOR),
+            ))
+        return node
 
+    @staticmethod
+    def export_project_glb(project_path: Union[Path, str], glb_path: Union[Path, str], verbose: bool = False, workers: int = 1, lod: bool = True):
+        """
+        Export the project as binary glTF, each part is one quantized mesh and each part reference a node
+        """
+        logger.setLevel(logging.INFO if verbose else logging.ERROR)
         project_path = Path(project_path)
         project = CadService.read_project(project_path)
 
-        cq_assembly = project.root_assembly.to_cq(project)
+        orion_cache_path = project_path / CACHE_DIRECTORY
+        root_node = CadService.get_gltf_node(project)
+        checksums = dict.fromkeys(part_ref.variation.checksum for part_ref in project.part_refs.values())
+        if lod:
+            meshes = CadService.get_lod_meshes(project, checksums, orion_cache_path / TESSELLATION_DIRECTORY, workers)
+        else:
+            meshes = CadService.get_part_meshes(project, checksums, orion_cache_path / TESSELLATION_DIRECTORY, workers)
+
+        logger.info(f"Writing {len(meshes)} meshes and {len(project.part_refs)} part references to {glb_path}")
+        GltfHelper.export_glb(root_node, meshes, glb_path)
 
-        orion_cache_path = project_path / ".orion_cache"
+    @staticmethod
+    def visualize_project(project_path: Union[Path, str], remote_viewer=False, export_html=True, auto_open=True, verbose=True, workers: int = 1, lod: bool = True):
+        logger.setLevel(logging.INFO if verbose else logging.ERROR)
+
+        project_path = Path(project_path)
+        project = CadService.read_project(project_path)
+
+        orion_cache_path = project_path / CACHE_DIRECTORY
         orion_cache_path.mkdir(parents=True, exist_ok=True)
 
         logger.info(f"Generating visualization")
-        viewer = CadHelper.get_viewer(cq_assembly, orion_cache_path / "tesselation.cache", remote_viewer)
-        
-        if viewer and export_html:
+        # the pickled cache of earlier versions is replaced by the tessellation store
+        (orion_cache_path / "tesselation.cache").unlink(missing_ok=True)
+
+        if remote_viewer:
+            project.inventory.parts.load(workers=workers)
+            cq_assembly = project.root_assembly.to_cq(project)
+            CadHelper.get_viewer(cq_assembly, orion_cache_path / TESSELLATION_DIRECTORY, remote_viewer)
+            return
+
+        if export_html:
+            # each part is tessellated once and drawn as instances
             html_path = orion_cache_path / 'index.html'
-            viewer.export_html(str(html_path))
+            CadService.export_display_html(project, html_path, orion_cache_path / TESSELLATION_DIRECTORY, workers, lod)
             logger.info(f"\n\nExported HTML to {html_path}")
             # open html in browser
             # if auto_open:
@@ -35,7 +35,7 @@ from orion_cli.templates.gitignore_template import GITIGNORE_TEMPLATE
 from .base_service import BaseService
 
 class CreateService(BaseService):
-    def create(self, name: str, path: Union[str, Path], cad_path: Union[str, Path], remote_url: Optional[str] = None, include_assets: bool = False):
+    def create(self, name: str, path: Union[str, Path], cad_path: Union[str, Path], remote_url: Optional[str] = None, include_assets: bool = False, workers: int = 1, thumbnail_format: str = "svg"):
         """Create a new project"""
         assert RemoteHelper.ensure_git_installed(), "Git is not installed. Please install Git and try again."
         assert RemoteHelper.ensure_git_configured(), (
@@ -47,7 +47,7 @@ class CreateService(BaseService):
         
         project_path = Path(path) / name
         cad_path = Path(cad_path).resolve()
-        project_options = ProjectOptions(include_assets=include_assets)
+        project_options = ProjectOptions(include_assets=include_assets, workers=workers, thumbnail_format=thumbnail_format)
         
         click.echo(f"Creating project '{name}' at {project_path}")
         project_path.mkdir(parents=True, exist_ok=True)
@@ -88,7 +88,7 @@ class CreateService(BaseService):
         )
 
         # Create a README file
-        cover_image_path = f"./assets/{project.root_assembly.long_name}.svg" if include_assets else None
+        cover_image_path = f"./assets/{project.root_assembly.long_name}.{project.options.thumbnail_format}" if include_assets else None
         readme_content = README_TEMPLATE(name, remote_url, cover_image_path)
         (project_path / "README.md").write_text(readme_content)
 
@@ -29,11 +29,11 @@ from orion_cli.services.cad_service import CadService
 
 class DisplayService:
     @staticmethod
-    def display(project_path: Union[str, Path]):
+    def display(project_path: Union[str, Path], workers: int = 1, lod: bool = True):
         """Displays the current project"""
         try:
            project_path = Path(project_path)
-           CadService.visualize_project(project_path, verbose=True)
+           CadService.visualize_project(project_path, verbose=True, workers=workers, lod=lod)
 
         except Exception as e:
             click.echo(f"An unexpected error occurred: {e}")
\ No newline at end of file
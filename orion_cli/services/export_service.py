@@ -0,0 +1,37 @@
+# MIT License
+#
+# Copyright (c) 2025 Open Orion, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+from pathlib import Path
+from typing import Optional, Union
+import click
+
+from orion_cli.services.cad_service import CadService
+from .base_service import BaseService
+
+class ExportService(BaseService):
+    def export(self, project_path: Union[str, Path], export_format: str, output_path: Optional[Union[str, Path]] = None, workers: int = 1, lod: bool = True):
+        """Export the project assembly to a 3D file"""
+        project_path = Path(project_path)
+        output_path = Path(output_path) if output_path else project_path / f"{project_path.resolve().name}.{export_format}"
+
+        click.echo(f"Exporting project at {project_path} to {output_path}")
+        CadService.export_project_glb(project_path, output_path, verbose=True, workers=workers, lod=lod)
+        click.echo(f"Exported {output_path}")
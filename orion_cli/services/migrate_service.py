@@ -0,0 +1,48 @@
+# MIT License
+#
+# Copyright (c) 2025 Open Orion, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from pathlib import Path
+from typing import Optional, Union
+import click
+
+from orion_cli.services.cad_service import CadService
+from orion_cli.helpers.config_helper import ConfigHelper
+from .base_service import BaseService
+
+class MigrateService(BaseService):
+    def migrate(self, project_path: Union[str, Path], part_format: str, compress_parts: Optional[bool] = None):
+        """Rewrite the inventory parts of a project in a new storage format"""
+        project_path = Path(project_path)
+        config_path = project_path / "config.yaml"
+        config = ConfigHelper.load_config(config_path)
+
+        options = config.options.model_copy(update={"part_format": part_format})
+        if compress_parts is not None:
+            options.compress_parts = compress_parts
+
+        click.echo(f"Migrating project at {project_path} to {options.part_format} part files")
+        CadService.migrate_parts(project_path, options, verbose=True)
+
+        config.options = options
+        ConfigHelper.save_config(config_path, config)
+        click.echo(f"Updated part format in config.yaml to {options.part_format}")
@@ -0,0 +1,381 @@
+# MIT License
+#
+# Copyright (c) 2025 Open Orion, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# self contained WebGL 2 page, so it also works offline. Every part group is drawn with instancing, faces and
+# edges share the instance matrices of the group. __SCENE__ is replaced by the scene json
+VIEWER_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>__TITLE__</title>
+    <style>
+        body { margin: 0; overflow: hidden; background: #f5f5f5; }
+        canvas { display: block; width: 100vw; height: 100vh; }
+        #info { position: absolute; top: 8px; left: 8px; font: 12px sans-serif; color: #555; }
+    </style>
+</head>
+<body>
+    <canvas id="viewer"></canvas>
+    <div id="info"></div>
+    <script type="module">
+        const scene = __SCENE__;
+
+        function decode(data, ArrayType) {
+            const binary = atob(data);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) {
+                bytes[i] = binary.charCodeAt(i);
+            }
+            return new ArrayType(bytes.buffer);
+        }
+
+        // column major 4x4 matrices
+        function multiply(a, b) {
+            const out = new Float32Array(16);
+            for (let col = 0; col < 4; col++) {
+                for (let row = 0; row < 4; row++) {
+                    let sum = 0;
+                    for (let k = 0; k < 4; k++) {
+                        sum += a[k * 4 + row] * b[col * 4 + k];
+                    }
+                    out[col * 4 + row] = sum;
+                }
+            }
+            return out;
+        }
+
+        function perspective(fovy, aspect, near, far) {
+            const f = 1 / Math.tan(fovy / 2);
+            return new Float32Array([
+                f / aspect, 0, 0, 0,
+                0, f, 0, 0,
+                0, 0, (far + near) / (near - far), -1,
+                0, 0, 2 * far * near / (near - far), 0,
+            ]);
+        }
+
+        const sub = (a, b) => [a[0] - b[0], a[1] - b[1], a[2] - b[2]];
+        const cross = (a, b) => [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]];
+        const dot = (a, b) => a[0] * b[0] + a[1] * b[1] + a[2] * b[2];
+        const normalize = (a) => { const l = Math.hypot(...a) || 1; return [a[0] / l, a[1] / l, a[2] / l]; };
+
+        function lookAt(eye, target, up) {
+            const z = normalize(sub(eye, target));
+            const x = normalize(cross(up, z));
+            const y = cross(z, x);
+            return new Float32Array([
+                x[0], y[0], z[0], 0,
+                x[1], y[1], z[1], 0,
+                x[2], y[2], z[2], 0,
+                -dot(x, eye), -dot(y, eye), -dot(z, eye), 1,
+            ]);
+        }
+
+        const canvas = document.getElementById("viewer");
+        const info = document.getElementById("info");
+        const gl = canvas.getContext("webgl2", { antialias: true });
+        if (!gl) {
+            info.textContent = "WebGL 2 is not available in this browser";
+            throw new Error("WebGL 2 is not available");
+        }
+
+        function createProgram(vertexSource, fragmentSource) {
+            const program = gl.createProgram();
+            for (const [type, source] of [[gl.VERTEX_SHADER, vertexSource], [gl.FRAGMENT_SHADER, fragmentSource]]) {
+                const shader = gl.createShader(type);
+                gl.shaderSource(shader, source);
+                gl.compileShader(shader);
+                if (!gl.getShaderParameter(shader, gl.COMPILE_STATUS)) {
+                    throw new Error(gl.getShaderInfoLog(shader));
+                }
+                gl.attachShader(program, shader);
+            }
+            gl.linkProgram(program);
+            if (!gl.getProgramParameter(program, gl.LINK_STATUS)) {
+                throw new Error(gl.getProgramInfoLog(program));
+            }
+            const uniforms = {};
+            for (let i = 0; i < gl.getProgramParameter(program, gl.ACTIVE_UNIFORMS); i++) {
+                const name = gl.getActiveUniform(program, i).name;
+                uniforms[name] = gl.getUniformLocation(program, name);
+            }
+            return { program, uniforms };
+        }
+
+        // instance matrices use the attribute locations 2 to 5, one per column
+        const meshProgram = createProgram(`#version 300 es
+            layout(location = 0) in vec3 position;
+            layout(location = 1) in vec3 normal;
+            layout(location = 2) in mat4 instanceMatrix;
+            uniform mat4 viewProjection;
+            out vec3 worldNormal;
+            void main() {
+                worldNormal = mat3(instanceMatrix) * normal;
+                gl_Position = viewProjection * instanceMatrix * vec4(position, 1.0);
+            }`, `#version 300 es
+            precision highp float;
+            in vec3 worldNormal;
+            uniform vec3 color;
+            uniform float alpha;
+            uniform vec3 lightDirection;
+            out vec4 fragColor;
+            void main() {
+                // two sided lambert shading, faces without normals are drawn flat
+                float lambert = length(worldNormal) > 0.0 ? abs(dot(normalize(worldNormal), lightDirection)) : 1.0;
+                fragColor = vec4(color * (0.35 + 0.65 * lambert), alpha);
+            }`);
+        const edgeProgram = createProgram(`#version 300 es
+            layout(location = 0) in vec3 position;
+            layout(location = 2) in mat4 instanceMatrix;
+            uniform mat4 viewProjection;
+            void main() {
+                gl_Position = viewProjection * instanceMatrix * vec4(position, 1.0);
+            }`, `#version 300 es
+            precision highp float;
+            uniform vec3 color;
+            out vec4 fragColor;
+            void main() {
+                fragColor = vec4(color, 1.0);
+            }`);
+
+        function createBuffer(target, data) {
+            const buffer = gl.createBuffer();
+            gl.bindBuffer(target, buffer);
+            gl.bufferData(target, data, gl.STATIC_DRAW);
+            return buffer;
+        }
+
+        function bindAttribute(location, buffer, size) {
+            gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+            gl.enableVertexAttribArray(location);
+            gl.vertexAttribPointer(location, size, gl.FLOAT, false, 0, 0);
+        }
+
+        function bindInstanceMatrices(buffer) {
+            gl.bindBuffer(gl.ARRAY_BUFFER, buffer);
+            for (let column = 0; column < 4; column++) {
+                gl.enableVertexAttribArray(2 + column);
+                gl.vertexAttribPointer(2 + column, 4, gl.FLOAT, false, 64, column * 16);
+                gl.vertexAttribDivisor(2 + column, 1);
+            }
+        }
+
+        // one set of buffers per part, shared by all of its groups
+        const meshes = {};
+        for (const [checksum, mesh] of Object.entries(scene.meshes)) {
+            const vertices = decode(mesh.vertices, Float32Array);
+            const normals = decode(mesh.normals, Float32Array);
+            const triangles = decode(mesh.triangles, Uint32Array);
+            const edges = decode(mesh.edges, Float32Array);
+            const lower = [Infinity, Infinity, Infinity];
+            const upper = [-Infinity, -Infinity, -Infinity];
+            for (let i = 0; i < vertices.length; i += 3) {
+                for (let axis = 0; axis < 3; axis++) {
+                    lower[axis] = Math.min(lower[axis], vertices[i + axis]);
+                    upper[axis] = Math.max(upper[axis], vertices[i + axis]);
+                }
+            }
+            meshes[checksum] = {
+                vertices: createBuffer(gl.ARRAY_BUFFER, vertices),
+                normals: normals.length === vertices.length ? createBuffer(gl.ARRAY_BUFFER, normals) : null,
+                triangles: createBuffer(gl.ELEMENT_ARRAY_BUFFER, triangles),
+                edges: createBuffer(gl.ARRAY_BUFFER, edges),
+                numIndices: triangles.length,
+                numEdgeVertices: edges.length / 3,
+                center: vertices.length ? [0, 1, 2].map((axis) => (lower[axis] + upper[axis]) / 2) : [0, 0, 0],
+                radius: vertices.length ? Math.hypot(...sub(upper, lower)) / 2 : 0,
+            };
+        }
+
+        // a face and an edge vertex array per group, reading the instance matrices from the same buffer
+        const lower = [Infinity, Infinity, Infinity];
+        const upper = [-Infinity, -Infinity, -Infinity];
+        const groups = [];
+        let numInstances = 0;
+        for (const group of scene.groups) {
+            const mesh = meshes[group.mesh];
+            const matrices = decode(group.matrices, Float32Array);
+            const count = matrices.length / 16;
+            const matrixBuffer = createBuffer(gl.ARRAY_BUFFER, matrices);
+
+            const faces = gl.createVertexArray();
+            gl.bindVertexArray(faces);
+            bindAttribute(0, mesh.vertices, 3);
+            if (mesh.normals) {
+                bindAttribute(1, mesh.normals, 3);
+            } else {
+                gl.disableVertexAttribArray(1);
+            }
+            bindInstanceMatrices(matrixBuffer);
+            gl.bindBuffer(gl.ELEMENT_ARRAY_BUFFER, mesh.triangles);
+
+            const edges = gl.createVertexArray();
+            gl.bindVertexArray(edges);
+            bindAttribute(0, mesh.edges, 3);
+            bindInstanceMatrices(matrixBuffer);
+            gl.bindVertexArray(null);
+
+            groups.push({ ...group, mesh, faces, edges, count });
+            numInstances += count;
+
+            // bounds of the bounding spheres of the instances
+            for (let i = 0; i < count; i++) {
+                const m = matrices.subarray(i * 16, i * 16 + 16);
+                const c = mesh.center;
+                for (let axis = 0; axis < 3; axis++) {
+                    const world = m[axis] * c[0] + m[4 + axis] * c[1] + m[8 + axis] * c[2] + m[12 + axis];
+                    lower[axis] = Math.min(lower[axis], world - mesh.radius);
+                    upper[axis] = Math.max(upper[axis], world + mesh.radius);
+                }
+            }
+        }
+        info.textContent = `${Object.keys(scene.meshes).length} parts, ${numInstances} instances`;
+
+        // orbit camera around the target with z up
+        const radius = numInstances ? Math.max(Math.hypot(...sub(upper, lower)) / 2, 1e-6) : 1;
+        const camera = {
+            target: numInstances ? [0, 1, 2].map((axis) => (lower[axis] + upper[axis]) / 2) : [0, 0, 0],
+            distance: radius * 2.5,
+            azimuth: -Math.PI / 4,
+            elevation: Math.asin(1 / Math.sqrt(3)),
+        };
+
+        function getEye() {
+            const { target, distance, azimuth, elevation } = camera;
+            return [
+                target[0] + distance * Math.cos(elevation) * Math.cos(azimuth),
+                target[1] + distance * Math.cos(elevation) * Math.sin(azimuth),
+                target[2] + distance * Math.sin(elevation),
+            ];
+        }
+
+        let frameRequested = false;
+        function requestRender() {
+            if (!frameRequested) {
+                frameRequested = true;
+                requestAnimationFrame(render);
+            }
+        }
+
+        function render() {
+            frameRequested = false;
+            const width = Math.round(canvas.clientWidth * window.devicePixelRatio);
+            const height = Math.round(canvas.clientHeight * window.devicePixelRatio);
+            if (canvas.width !== width || canvas.height !== height) {
+                canvas.width = width;
+                canvas.height = height;
+            }
+            gl.viewport(0, 0, width, height);
+            gl.clearColor(0xf5 / 255, 0xf5 / 255, 0xf5 / 255, 1);
+            gl.clear(gl.COLOR_BUFFER_BIT | gl.DEPTH_BUFFER_BIT);
+            gl.enable(gl.DEPTH_TEST);
+
+            const eye = getEye();
+            const near = Math.max(camera.distance - radius * 2, camera.distance / 1000);
+            const far = camera.distance + radius * 2;
+            const viewProjection = multiply(
+                perspective(Math.PI / 4, width / Math.max(height, 1), near, far),
+                lookAt(eye, camera.target, [0, 0, 1]),
+            );
+
+            // faces are pushed back so the edges drawn on them stay visible
+            gl.enable(gl.POLYGON_OFFSET_FILL);
+            gl.polygonOffset(1, 1);
+            gl.useProgram(meshProgram.program);
+            gl.uniformMatrix4fv(meshProgram.uniforms.viewProjection, false, viewProjection);
+            gl.uniform3fv(meshProgram.uniforms.lightDirection, normalize(sub(eye, camera.target)));
+            gl.vertexAttrib3f(1, 0, 0, 0);
+            // opaque groups first, transparent ones are blended over them without writing depth
+            for (const transparent of [false, true]) {
+                if (transparent) {
+                    gl.enable(gl.BLEND);
+                    gl.blendFunc(gl.SRC_ALPHA, gl.ONE_MINUS_SRC_ALPHA);
+                    gl.depthMask(false);
+                }
+                for (const group of groups) {
+                    if ((group.alpha < 1) !== transparent || !group.mesh.numIndices) {
+                        continue;
+                    }
+                    gl.uniform3fv(meshProgram.uniforms.color, group.color);
+                    gl.uniform1f(meshProgram.uniforms.alpha, group.alpha);
+                    gl.bindVertexArray(group.faces);
+                    gl.drawElementsInstanced(gl.TRIANGLES, group.mesh.numIndices, gl.UNSIGNED_INT, 0, group.count);
+                }
+            }
+            gl.disable(gl.BLEND);
+            gl.depthMask(true);
+            gl.disable(gl.POLYGON_OFFSET_FILL);
+
+            gl.useProgram(edgeProgram.program);
+            gl.uniformMatrix4fv(edgeProgram.uniforms.viewProjection, false, viewProjection);
+            gl.uniform3fv(edgeProgram.uniforms.color, [0x33 / 255, 0x33 / 255, 0x33 / 255]);
+            for (const group of groups) {
+                if (group.mesh.numEdgeVertices) {
+                    gl.bindVertexArray(group.edges);
+                    gl.drawArraysInstanced(gl.LINES, 0, group.mesh.numEdgeVertices, group.count);
+                }
+            }
+            gl.bindVertexArray(null);
+        }
+
+        // left drag rotates, right or shift drag pans and the wheel zooms
+        let drag = null;
+        canvas.addEventListener("contextmenu", (event) => event.preventDefault());
+        canvas.addEventListener("pointerdown", (event) => {
+            drag = { x: event.clientX, y: event.clientY, pan: event.button === 2 || event.shiftKey };
+            canvas.setPointerCapture(event.pointerId);
+        });
+        canvas.addEventListener("pointerup", () => { drag = null; });
+        canvas.addEventListener("pointermove", (event) => {
+            if (!drag) {
+                return;
+            }
+            const dx = event.clientX - drag.x;
+            const dy = event.clientY - drag.y;
+            drag.x = event.clientX;
+            drag.y = event.clientY;
+            if (drag.pan) {
+                const forward = normalize(sub(camera.target, getEye()));
+                const right = normalize(cross(forward, [0, 0, 1]));
+                const up = cross(right, forward);
+                const scale = 2 * camera.distance * Math.tan(Math.PI / 8) / canvas.clientHeight;
+                for (let axis = 0; axis < 3; axis++) {
+                    camera.target[axis] += (-dx * right[axis] + dy * up[axis]) * scale;
+                }
+            } else {
+                const limit = Math.PI / 2 - 1e-3;
+                camera.azimuth -= dx * 0.01;
+                camera.elevation = Math.min(Math.max(camera.elevation + dy * 0.01, -limit), limit);
+            }
+            requestRender();
+        });
+        canvas.addEventListener("wheel", (event) => {
+            event.preventDefault();
+            camera.distance = Math.min(Math.max(camera.distance * Math.exp(event.deltaY * 0.001), radius / 100), radius * 100);
+            requestRender();
+        }, { passive: false });
+        window.addEventListener("resize", requestRender);
+        requestRender();
+    </script>
+</body>
+</html>
+"""
@@ -20,8 +20,112 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import functools
+import json
+import multiprocessing
+import os
+import struct
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from click.testing import CliRunner
+import pytest
+import numpy as np
 from orion_cli.cli import cli
+from orion_cli.helpers.gltf_helper import GltfHelper, GltfNode
+
+def cq_tesselate_shape(shape, deviation=0.1, angular_tolerance=0.2):
+    """
+    Tessellation with the CadQuery mesher, for tests that should not depend on ocp_tessellate
+    """
+    from orion_cli.helpers.cad_helper import Mesh
+    vertices, triangles = shape.tessellate(deviation, angular_tolerance)
+    vertices = np.array([vertex.toTuple() for vertex in vertices]).reshape(-1, 3)
+    return Mesh(vertices=vertices, simplices=np.array(triangles).reshape(-1, 3), normals=np.zeros_like(vertices), edges=np.zeros((0, 2, 3)))
+
+
+def decode_png(data: bytes):
+    """
+    Decode an unfiltered 8 bit RGBA PNG as written by AssetHelper.encodePNG
+    """
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    offset, chunks = 8, {}
+    while offset < len(data):
+        length, tag = struct.unpack(">I4s", data[offset:offset + 8])
+        chunks[tag] = chunks.get(tag, b"") + data[offset + 8:offset + 8 + length]
+        offset += length + 12
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (bit_depth, color_type) == (8, 6)
+    scanlines = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, 1 + width * 4)
+    assert not scanlines[:, 0].any()
+    return scanlines[:, 1:].reshape(height, width, 4)
+
+
+def make_nested_assembly(shared_shape: bool = True):
+    """
+    Root with a part and a rotated subassembly, which holds a part and a nested subassembly with a tilted part.
+    The box is asymmetric so a wrong orientation changes its bounding box. Without a shared shape every
+    part is a separate copy of the box.
+    """
+    import cadquery as cq
+
+    shared_box = cq.Workplane().box(1, 2, 3)
+
+    def box():
+        return shared_box if shared_shape else cq.Workplane().box(1, 2, 3)
+
+    nested = cq.Assembly(name="nested", loc=cq.Location(cq.Vector(0, 5, 0)))
+    nested.add(box(), name="tilted", loc=cq.Location(cq.Vector(0, 0, 2), cq.Vector(1, 0, 0), 90))
+    sub = cq.Assembly(name="sub", loc=cq.Location(cq.Vector(10, 0, 0), cq.Vector(0, 0, 1), 90))
+    sub.add(box(), name="part", loc=cq.Location(cq.Vector(1, 0, 0)))
+    sub.add(nested)
+    root = cq.Assembly(name="root")
+    root.add(box(), name="part")
+    root.add(sub)
+    return root
+
+
+@pytest.fixture
+def nested_assembly_with_pin():
+    """
+    The nested assembly with a red cylinder as a second part in the root, to have more than one part in the inventory
+    """
+    import cadquery as cq
+
+    cq_assembly = make_nested_assembly()
+    cq_assembly.add(cq.Workplane().cylinder(4, 1), name="pin", loc=cq.Location(cq.Vector(0, 0, 10)), color=cq.Color(1, 0, 0))
+    return cq_assembly
+
+
+def get_world_bounds(cq_assembly, loc=None, path=""):
+    """
+    World bounding boxes of the leaf shapes of an assembly by part path
+    """
+    import cadquery as cq
+
+    loc = cq.Location() if loc is None else loc * cq_assembly.loc
+    path = f"{path}/{cq_assembly.name}"
+    bounds = {}
+    for shape in cq_assembly.shapes:
+        bb = shape.moved(loc).BoundingBox()
+        bounds[path] = np.array([[bb.xmin, bb.ymin, bb.zmin], [bb.xmax, bb.ymax, bb.zmax]])
+    for child in cq_assembly.children:
+        bounds.update(get_world_bounds(child, loc, path))
+    return bounds
+
+
+def create_step_project(tmp_path, cq_assembly, options=None):
+    """
+    Export the assembly to a STEP file and create a project from it, returns the project and STEP paths
+    """
+    from orion_cli.services.cad_service import CadService
+
+    step_path = tmp_path / "model.step"
+    cq_assembly.export(str(step_path))
+    project_path = tmp_path / "project"
+    CadService.create_project(project_path, step_path, options)
+    return project_path, step_path
 
 
 def test_version():
@@ -30,3 +134,633 @@ def test_version():
         result = runner.invoke(cli, ["--version"])
         assert result.exit_code == 0
         assert result.output.startswith("cli, version ")
+
+
+def test_cli_import_is_lightweight():
+    heavy_modules = ["cadquery", "OCP", "pandas", "scipy", "ocp_tessellate"]
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, orion_cli.cli; print([m for m in {heavy_modules} if m in sys.modules])"],
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_glb_export(tmp_path):
+    mesh = {
+        "vertices": np.array([[0, 0, 0], [10, 0, 0], [0, 10, 0], [0, 0, 10]], dtype=np.float32),
+        "normals": np.eye(3, dtype=np.float32)[[2, 2, 2, 0]],
+        "triangles": np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]], dtype=np.uint32),
+    }
+    offset = np.eye(4)
+    offset[:3, 3] = [20, 0, 0]
+    root = GltfNode(name="root", children=[
+        GltfNode(name="a", mesh=("part", (1.0, 0.0, 0.0))),
+        GltfNode(name="b", matrix=offset, mesh=("part", (1.0, 0.0, 0.0))),
+        GltfNode(name="c", mesh=("part", (0.0, 0.0, 1.0, 0.5))),
+    ])
+    glb_path = tmp_path / "test.glb"
+    GltfHelper.export_glb(root, {"part": mesh}, glb_path)
+
+    data = glb_path.read_bytes()
+    magic, version, length = struct.unpack("<4sII", data[:12])
+    assert (magic, version, length) == (b"glTF", 2, len(data))
+    json_length, _ = struct.unpack("<II", data[12:20])
+    gltf = json.loads(data[20:20 + json_length])
+    # one shared set of accessors, a mesh per color
+    assert len(gltf["accessors"]) == 3
+    assert len(gltf["meshes"]) == 2
+    assert gltf["nodes"][1]["mesh"] == gltf["nodes"][2]["mesh"]
+
+    binary = data[28 + json_length:]
+    positions = np.frombuffer(binary, "<i2", 4 * 4).reshape(-1, 4)[:, :3]
+    matrix = np.array(gltf["nodes"][2]["matrix"]).reshape(4, 4).T
+    world = positions / 32767 @ matrix[:3, :3].T + matrix[:3, 3]
+    assert np.allclose(world, mesh["vertices"] + [20, 0, 0], atol=1e-3)
+
+    # a mesh without triangles takes no space in the buffer
+    empty_mesh = {"vertices": np.array([[0, 0, 0], [1, 1, 1]], dtype=np.float32), "normals": np.zeros((2, 3), dtype=np.float32), "triangles": np.zeros((0, 3), dtype=np.uint32)}
+    root = GltfNode(name="root", children=[GltfNode(name="empty", mesh=("empty", (1.0, 0.0, 0.0))), GltfNode(name="a", mesh=("part", (1.0, 0.0, 0.0)))])
+    GltfHelper.export_glb(root, {"empty": empty_mesh, "part": mesh}, glb_path)
+    data = glb_path.read_bytes()
+    _, _, length = struct.unpack("<4sII", data[:12])
+    json_length, _ = struct.unpack("<II", data[12:20])
+    gltf = json.loads(data[20:20 + json_length])
+    bin_length, _ = struct.unpack("<II", data[20 + json_length:28 + json_length])
+    assert length == len(data)
+    assert bin_length == gltf["buffers"][0]["byteLength"] == len(data) - 28 - json_length
+    assert gltf["bufferViews"][0]["byteOffset"] == 0
+    positions = np.frombuffer(data[28 + json_length:], "<i2", 4 * 4).reshape(-1, 4)[:, :3]
+    matrix = np.array(gltf["nodes"][2]["matrix"]).reshape(4, 4).T
+    assert np.allclose(positions / 32767 @ matrix[:3, :3].T + matrix[:3, 3], mesh["vertices"], atol=1e-3)
+
+
+def test_shape_used_as_reference_and_part():
+    import cadquery as cq
+    from orion_cli.services.cad_service import CadService, Project
+
+    box = cq.Workplane().box(1, 2, 3)
+    cq_assembly = cq.Assembly(name="root")
+    cq_assembly.add(box, name="reference", metadata={"is_reference": True})
+    cq_assembly.add(box, name="part", loc=cq.Location(cq.Vector(5, 0, 0)))
+    cq_assembly.add(box, name="rotated", loc=cq.Location(cq.Vector(0, 9, 0), cq.Vector(0, 0, 1), 90))
+    project = Project()
+    CadService.read_cq_assembly(cq_assembly, project)
+
+    assert len(project.inventory.catalog.items) == 1
+    part_ref, rotated_ref = project.part_refs["/root/part"], project.part_refs["/root/rotated"]
+    assert np.allclose(rotated_ref.location.position, [0, 9, 0])
+    assert np.allclose(part_ref.location.position, [5, 0, 0])
+
+
+def test_png_part_colors(monkeypatch):
+    import cadquery as cq
+    from orion_cli.helpers.asset_helper import AssetHelper, PNGOptions
+    from orion_cli.helpers.cad_helper import CadHelper
+
+    monkeypatch.setattr(CadHelper, "tesselate_shape", staticmethod(cq_tesselate_shape))
+    box = cq.Workplane().box(10, 10, 10)
+    cq_assembly = cq.Assembly(name="root")
+    cq_assembly.add(box, name="red", color=cq.Color(1, 0, 0))
+    cq_assembly.add(box, name="blue", color=cq.Color(0, 0, 1), loc=cq.Location(cq.Vector(40, 0, 0)))
+    cq_assembly.add(box, name="default", loc=cq.Location(cq.Vector(80, 0, 0)))
+
+    image = decode_png(AssetHelper.getPNG(cq_assembly, PNGOptions(width=120, height=40)))
+    assert image.shape == (40, 120, 4)
+    assert image[0, 0, 3] == 0
+    opaque = image[image[..., 3] == 255][:, :3].astype(int)
+    red = (opaque[:, 0] > 0) & (opaque[:, 1] == 0) & (opaque[:, 2] == 0)
+    blue = (opaque[:, 2] > 0) & (opaque[:, 0] == 0) & (opaque[:, 1] == 0)
+    default = (opaque[:, 0] > 0) & (opaque[:, 1] > opaque[:, 0]) & (opaque[:, 2] > opaque[:, 1])
+    assert red.sum() > 50 and blue.sum() > 50 and default.sum() > 50
+
+
+def test_tessellation_store(tmp_path):
+    import os
+    from orion_cli.helpers.cad_helper import TessellationStore
+
+    mesh = {"vertices": np.zeros((100, 3), dtype=np.float32), "triangles": np.zeros((10, 3), dtype=np.uint32)}
+    keys = [(tuple(f"{i}{'0' * 31}" for _ in range(20)), "mesh", 0.1, 0.2) for i in range(4)]
+    store = TessellationStore(tmp_path, max_bytes=None)
+    for i, key in enumerate(keys[:3]):
+        store[key] = mesh
+        os.utime(store.get_entry_path(key), ns=(i * 10**9, i * 10**9))
+    # entry names do not grow with the number of checksums in the key
+    assert all(len(entry_path.name) <= 32 for entry_path in tmp_path.iterdir())
+    assert set(store) == set(keys[:3])
+    assert np.array_equal(store[keys[0]]["vertices"], mesh["vertices"])
+
+    with pytest.raises(ValueError):
+        store[(object(),)] = mesh
+
+    # reading the first entry makes it the most recently used, the next two are evicted
+    entry_size = TessellationStore.get_entry_size(store.get_entry_path(keys[0]))
+    store.max_bytes = entry_size * 5 // 2
+    store[keys[3]] = mesh
+    assert set(store) == {keys[0], keys[3]}
+
+
+def test_viewer_is_self_contained():
+    from orion_cli.templates.viewer_template import VIEWER_TEMPLATE
+
+    # the page is opened from disk and must not load scripts from the network
+    assert "http" not in VIEWER_TEMPLATE and "import " not in VIEWER_TEMPLATE
+
+
+def test_variation_refs_are_interned():
+    import gc
+    from orion_cli.services.cad_service import InventoryVariationRef, PartRef
+
+    part_refs = [PartRef.model_validate_json(json.dumps({"path": f"/root/part_{i}", "variation": {"checksum": "abc", "id": 1}})) for i in range(3)]
+    assert part_refs[0].variation is part_refs[1].variation is part_refs[2].variation
+    assert PartRef(path="/root/other", variation=InventoryVariationRef(checksum="abc", id=2)).variation is not part_refs[0].variation
+
+    # variations are released with the last part reference using them
+    del part_refs
+    gc.collect()
+    assert ("abc", 1) not in InventoryVariationRef.interned
+
+
+def test_manifest_picks_up_assembly_edits(tmp_path):
+    import cadquery as cq
+    from orion_cli.services.cad_service import CadService, Project
+
+    cq_assembly = cq.Assembly(name="root")
+    cq_assembly.add(cq.Workplane().box(1, 2, 3), name="part", loc=cq.Location(cq.Vector(5, 0, 0)))
+    project = Project()
+    CadService.read_cq_assembly(cq_assembly, project)
+    CadService.write_project(tmp_path, project)
+
+    # the first read writes the manifest, the second one is served from it
+    assert CadService.read_project(tmp_path).part_refs["/root/part"].location.position[0] == 5
+    assert (tmp_path / ".orion_cache" / "manifest.json").is_file()
+    assert CadService.read_project(tmp_path).part_refs["/root/part"].location.position[0] == 5
+
+    # same size and modification time, only the content differs
+    assembly_file = tmp_path / "assemblies" / "root" / "assembly.json"
+    stat = assembly_file.stat()
+    content = assembly_file.read_text()
+    assert content.count("5.0,") == 1
+    assembly_file.write_text(content.replace("5.0,", "7.0,"))
+    os.utime(assembly_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert assembly_file.stat().st_size == stat.st_size
+    assert CadService.read_project(tmp_path).part_refs["/root/part"].location.position[0] == 7
+
+
+@pytest.mark.parametrize("shared_shape", [True, False])
+@pytest.mark.parametrize("normalize_axis", [False, True])
+def test_part_instance_world_transforms(shared_shape, normalize_axis):
+    from orion_cli.services.cad_service import CadService, Project, ProjectOptions
+
+    cq_assembly = make_nested_assembly(shared_shape)
+    project = Project(options=ProjectOptions(normalize_axis=normalize_axis))
+    CadService.read_cq_assembly(cq_assembly, project)
+    assert len(project.inventory.catalog.items) == 1
+
+    # depth first, the parts of subassemblies before the parts of their parent
+    transforms = project.get_transform_table()
+    assert transforms.part_paths == ["/root/sub/nested/tilted", "/root/sub/part", "/root/part"]
+
+    expected_bounds = get_world_bounds(cq_assembly)
+    instances = list(CadService.get_part_instances(project, transforms))
+    assert len(instances) == len(expected_bounds)
+    for part_ref, matrix in instances:
+        vertices = np.array([vertex.toTuple() for vertex in project.inventory.parts[part_ref.variation.checksum].Vertices()])
+        world_vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+        bounds = np.stack([world_vertices.min(axis=0), world_vertices.max(axis=0)])
+        assert np.allclose(bounds, expected_bounds[part_ref.path], atol=1e-6), part_ref.path
+
+
+def test_outdated_assembly_format_is_revised(tmp_path):
+    from orion_cli.services.cad_service import ASSEMBLY_FORMAT_VERSION, CadService, ProjectOptions
+
+    project_path, step_path = create_step_project(tmp_path, make_nested_assembly(), ProjectOptions())
+    assembly_files = {file_path: file_path.read_text() for file_path in (project_path / "assemblies").rglob("assembly.json")}
+    assert all(json.loads(content)["version"] == ASSEMBLY_FORMAT_VERSION for content in assembly_files.values())
+
+    # files written before the format was versioned had part locations in the root frame
+    world_matrices = {part_ref.path: matrix for part_ref, matrix in CadService.get_part_instances(CadService.read_project(project_path))}
+    for file_path, content in assembly_files.items():
+        assembly = json.loads(content)
+        del assembly["version"]
+        for part_ref in assembly["parts"]:
+            matrix = world_matrices[part_ref["path"]]
+            part_ref["location"] = {"position": matrix[:3, 3].tolist(), "orientation": matrix[:3, :3].tolist()}
+        file_path.write_text(json.dumps(assembly))
+    assert CadService.read_project(project_path).format_version == 1
+
+    # the unchanged source is revised and every assembly is written in the current format
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions())
+    assert {file_path: file_path.read_text() for file_path in assembly_files} == assembly_files
+    assert CadService.read_project(project_path).format_version == ASSEMBLY_FORMAT_VERSION
+
+
+def test_parallel_canonicalization_matches_serial():
+    from orion_cli.services.cad_service import CadService, Project, ProjectOptions
+
+    projects = []
+    for workers in (1, 2):
+        project = Project(options=ProjectOptions(workers=workers, normalize_axis=True))
+        CadService.read_cq_assembly(make_nested_assembly(shared_shape=False), project)
+        projects.append(project)
+    serial, parallel = projects
+
+    # the copies of the box are one catalog item either way
+    assert list(parallel.inventory.catalog.items) == list(serial.inventory.catalog.items)
+    assert len(serial.inventory.catalog.items) == 1
+    assert list(parallel.part_refs) == list(serial.part_refs)
+    for path, part_ref in serial.part_refs.items():
+        assert parallel.part_refs[path].variation == part_ref.variation
+        assert np.allclose(parallel.part_refs[path].location.to_matrix(), part_ref.location.to_matrix(), atol=1e-9)
+
+
+def test_revise_skips_unchanged_source(tmp_path, monkeypatch):
+    from orion_cli.helpers.cad_helper import CadHelper
+    from orion_cli.services.cad_service import CadService, ProjectOptions
+
+    project_path, step_path = create_step_project(tmp_path, make_nested_assembly(), ProjectOptions())
+
+    def import_step(file_path):
+        raise AssertionError("the STEP file should not be read")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(CadHelper, "import_step", staticmethod(import_step))
+        project = CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions(workers=4))
+    assert len(project.part_refs) == 3
+
+    # options that change the output revise the project
+    imported = []
+    import_step = CadHelper.import_step
+    monkeypatch.setattr(CadHelper, "import_step", staticmethod(lambda file_path: imported.append(file_path) or import_step(file_path)))
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions(normalize_axis=True))
+    assert imported == [step_path]
+
+    # a deleted part file or an edited assembly file revises the project, which rebuilds them
+    part_path = next((project_path / "inventory" / "parts").iterdir())
+    part_path.unlink()
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions(normalize_axis=True))
+    assert imported == [step_path] * 2 and part_path.is_file()
+    assembly_path = min((project_path / "assemblies").rglob("assembly.json"))
+    assembly_content = assembly_path.read_text()
+    assembly_path.write_text(assembly_content + "\n")
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions(normalize_axis=True))
+    assert imported == [step_path] * 3 and assembly_path.read_text() == assembly_content
+
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions(normalize_axis=True))
+    assert len(imported) == 3
+
+
+def backdate_files(path):
+    """
+    Set the modification time of the files to a fixed past time, so a rewrite is detected regardless of the
+    timestamp granularity, returns the modification times
+    """
+    mtimes = {}
+    for file_path in path.rglob("*"):
+        if file_path.is_file():
+            os.utime(file_path, ns=(10**18, 10**18))
+            mtimes[file_path] = 10**18
+    return mtimes
+
+
+def get_file_mtimes(path):
+    return {file_path: file_path.stat().st_mtime_ns for file_path in path.rglob("*") if file_path.is_file()}
+
+
+def test_revise_rewrites_only_changed_parts(tmp_path, nested_assembly_with_pin):
+    from orion_cli.services.cad_service import CadService, ProjectOptions
+
+    cq_assembly = nested_assembly_with_pin
+    project_path, step_path = create_step_project(tmp_path, cq_assembly, ProjectOptions())
+    inventory_path = project_path / "inventory"
+    part_files = sorted(file_path.name for file_path in (inventory_path / "parts").iterdir())
+    assert len(part_files) == 2
+
+    # a full revision from the same file leaves every part file and the catalog untouched
+    (project_path / ".orion_cache" / "source.json").unlink()
+    mtimes = backdate_files(inventory_path)
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions())
+    assert get_file_mtimes(inventory_path) == mtimes
+
+    # removing the pin only removes its part file
+    cq_assembly = make_nested_assembly()
+    cq_assembly.export(str(step_path))
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions())
+    remaining = {file_path: mtime for file_path, mtime in mtimes.items() if file_path.parent.name == "parts" and file_path.exists()}
+    assert len(remaining) == 1
+    assert get_file_mtimes(inventory_path / "parts") == remaining
+
+
+def test_revise_rewrites_only_changed_assemblies(tmp_path):
+    import cadquery as cq
+    from orion_cli.services.cad_service import CadService, ProjectOptions
+
+    project_path, step_path = create_step_project(tmp_path, make_nested_assembly(), ProjectOptions())
+    assemblies_path = project_path / "assemblies"
+    assembly_files = {file_path.parent.relative_to(assemblies_path).as_posix() for file_path in assemblies_path.rglob("assembly.json")}
+    assert len(assembly_files) == 3
+
+    (project_path / ".orion_cache" / "source.json").unlink()
+    mtimes = backdate_files(assemblies_path)
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions())
+    assert get_file_mtimes(assemblies_path) == mtimes
+
+    # a model without the subassembly removes its assembly files
+    cq_assembly = cq.Assembly(name="root")
+    cq_assembly.add(cq.Workplane().box(1, 2, 3), name="part")
+    cq_assembly.export(str(step_path))
+    CadService.revise_project(project_path, step_path, write=True, project_options=ProjectOptions())
+    assert [file_path.relative_to(assemblies_path).as_posix() for file_path in assemblies_path.rglob("assembly.json")] == ["root/assembly.json"]
+
+
+def test_asset_cache(tmp_path, monkeypatch, nested_assembly_with_pin):
+    from orion_cli.helpers.asset_helper import AssetHelper
+    from orion_cli.services.cad_service import CadService, Project
+
+    project = Project()
+    cq_assembly = nested_assembly_with_pin
+    CadService.read_cq_assembly(cq_assembly, project)
+    CadService.write_project(tmp_path, project)
+
+    rendered = []
+    export_asset = AssetHelper.exportAsset
+    monkeypatch.setattr(AssetHelper, "exportAsset", staticmethod(lambda shape, file_path, opts: rendered.append(file_path) or export_asset(shape, file_path, opts)))
+    CadService.write_assets(tmp_path, project)
+    cache_path = tmp_path / ".orion_cache" / "svg"
+    # both parts and the root assembly
+    assert len(rendered) == 3
+    assert sorted(cache_path.iterdir()) == sorted(rendered)
+    assert len(list((tmp_path / "assets").glob("*.svg"))) == 3
+
+    # nothing is rendered again for the same project
+    rendered.clear()
+    CadService.write_assets(tmp_path, project)
+    assert rendered == []
+
+    # recoloring a part only renders the root assembly, the previous root render is pruned
+    checksum = next(iter(project.inventory.catalog.items))
+    project.inventory.catalog.items[checksum].variations[0].color = [255, 0, 0, 1.0]
+    CadService.write_assets(tmp_path, project)
+    assert len(rendered) == 1
+    assert len(list(cache_path.iterdir())) == 3
+
+
+def test_svg_hlr_modes():
+    import cadquery as cq
+    from orion_cli.helpers.asset_helper import AssetHelper, SVGOptions
+
+    shape = cq.Workplane().box(10, 20, 5).faces(">Z").hole(3).val()
+    exact = AssetHelper.getSVG(shape, SVGOptions(hlrMode="exact"))
+    poly = AssetHelper.getSVG(shape, SVGOptions(hlrMode="poly"))
+    assert exact.startswith("<?xml") and poly.startswith("<?xml")
+    assert exact.count("<path") > 0 and poly.count("<path") > 0
+    # auto only switches to the polygonal mode above the face limit
+    assert AssetHelper.getSVG(shape, SVGOptions(hlrMode="auto")) == exact
+    assert AssetHelper.getSVG(shape, SVGOptions(hlrMode="auto", autoFaceLimit=1)) == poly
+
+
+def test_svg_path_simplification():
+    import re
+    import cadquery as cq
+    from orion_cli.helpers.asset_helper import AssetHelper, SVGOptions
+
+    # collinear points collapse to the end points, corners are kept
+    line = np.array([[0, 0], [1, 0.01], [2, 0], [3, 0]], dtype=np.float64)
+    assert AssetHelper.simplifyPolyline(line, 0.1).tolist() == [[0, 0], [3, 0]]
+    corner = np.array([[0, 0], [1, 0], [2, 0], [2, 1], [2, 2]], dtype=np.float64)
+    assert AssetHelper.simplifyPolyline(corner, 0.1).tolist() == [[0, 0], [2, 0], [2, 2]]
+
+    def get_max_decimals(svg: str):
+        coordinates = re.findall(r"-?\d+(?:\.\d+)?", " ".join(re.findall(r'<path d="([^"]*)"', svg)))
+        return max(len(value.partition(".")[2]) for value in coordinates)
+
+    # the precision is in pixels, coordinates are in model units scaled by about 24 pixels per unit here
+    shape = cq.Workplane().cylinder(5, 3).val()
+    full = AssetHelper.getSVG(shape, SVGOptions())
+    compact = AssetHelper.getSVG(shape, SVGOptions(precision=2, simplifyTolerance=0.5))
+    assert get_max_decimals(full) > 10
+    assert get_max_decimals(compact) <= 4
+    assert compact.count("<path") == full.count("<path")
+    assert len(compact) < len(full)
+
+
+def make_inventory(names):
+    from orion_cli.services.cad_service import CatalogItem, Inventory, InventoryPartVariation, InvetoryPartVariationMetadata
+
+    inventory = Inventory()
+    for i, name in enumerate(names):
+        variations = [InventoryPartVariation(id=1, references=[f"/root/{name}_{j}" for j in range(i + 1)])]
+        if i % 2:
+            metadata = InvetoryPartVariationMetadata(price=2.5, url="https://example.com/part")
+            variations.append(InventoryPartVariation(id=2, references=[f"/root/{name}_red"], color=[255, 0, 0, 1.0], metadata=metadata))
+        inventory.catalog.items[f"checksum_{i}"] = CatalogItem(name=name, variations=variations)
+    return inventory
+
+
+def test_inventory_markdown_matches_pandas(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("tabulate")
+    from orion_cli.services.cad_service import INVENTORY_COLUMNS, CadService
+
+    inventory = make_inventory(["bolt", "plate_with_a_long_name", "nut", "washer"])
+    rows = list(CadService.get_inventory_rows(inventory, tmp_path))
+    expected = "# Inventory\n" + pd.DataFrame(rows, columns=INVENTORY_COLUMNS).to_markdown(index=False)
+    assert CadService.get_inventory_markdown(inventory, tmp_path) == expected
+
+
+def test_inventory_markdown_pages(tmp_path):
+    from orion_cli.services.cad_service import CadService
+
+    inventory = make_inventory(["bolt", "bracket", "nut", "washer"])
+    CadService.write_inventory_markdown(tmp_path, inventory, page_size=2)
+    readme = (tmp_path / "README.md").read_text()
+    # the three variations starting with b do not fit on one page
+    assert "- [b](README_b.md) (2 variations)\n- [b_2](README_b_2.md) (1 variations)" in readme
+    assert sorted(page_path.name for page_path in tmp_path.glob("README_*.md")) == ["README_b.md", "README_b_2.md", "README_n.md", "README_w.md"]
+
+    # pages that are no longer needed are removed
+    CadService.write_inventory_markdown(tmp_path, inventory)
+    assert list(tmp_path.glob("README_*.md")) == []
+    assert "| bracket" in (tmp_path / "README.md").read_text()
+
+
+def test_part_lods():
+    import cadquery as cq
+    from orion_cli.services.cad_service import CadService, Project
+
+    cq_assembly = cq.Assembly(name="root")
+    cq_assembly.add(cq.Workplane().box(100, 10, 10), name="beam")
+    cq_assembly.add(cq.Workplane().box(5, 5, 5), name="bracket", loc=cq.Location(cq.Vector(0, 20, 0)))
+    cq_assembly.add(cq.Workplane().sphere(0.2), name="ball", loc=cq.Location(cq.Vector(0, 40, 0)))
+    project = Project()
+    CadService.read_cq_assembly(cq_assembly, project)
+
+    coarse_meshes = {
+        checksum: {"vertices": np.array([vertex.toTuple() for vertex in project.inventory.parts[checksum].Vertices()])}
+        for checksum in project.inventory.catalog.items
+    }
+    lods = CadService.get_part_lods(project, coarse_meshes)
+    names = {catalog_item.name: checksum for checksum, catalog_item in project.inventory.catalog.items.items()}
+    assert lods[names["beam"]] == "fine"
+    assert lods[names["bracket"]] == "medium"
+    assert lods[names["ball"]] == "coarse"
+
+
+def test_index_cache(tmp_path, monkeypatch):
+    from orion_cli.services.cad_service import AssemblyIndex, CadService, Project, ProjectOptions
+
+    options = ProjectOptions(normalize_axis=True)
+    project, index = Project(options=options), AssemblyIndex()
+    CadService.read_cq_assembly(make_nested_assembly(shared_shape=False), project, index)
+    CadService.write_project(tmp_path, project)
+    CadService.write_index(tmp_path, project, index)
+
+    cached_index = CadService.read_index(tmp_path, CadService.read_project(tmp_path), options)
+    assert cached_index.base_part_checksums == index.base_part_checksums
+    assert cached_index.aligned_refs.keys() == index.aligned_refs.keys() and len(index.aligned_refs) == 3
+
+    # revising from the cache gives the same project
+    revised = Project(options=options)
+    CadService.read_cq_assembly(make_nested_assembly(shared_shape=False), revised, cached_index)
+    assert revised.inventory.catalog.items.keys() == project.inventory.catalog.items.keys()
+    for path, part_ref in project.part_refs.items():
+        assert np.allclose(revised.part_refs[path].location.to_matrix(), part_ref.location.to_matrix(), atol=1e-9)
+
+    # a pooled revision only sends the parts missing from the cache to the pool
+    pooled_options = ProjectOptions(normalize_axis=True, workers=2)
+    canonicalize_parts = CadService.canonicalize_parts
+    canonical_parts = []
+
+    def record_canonical_parts(*args):
+        # read_cq_assembly clears the returned dict once the assembly is read
+        canonical_parts.append(canonicalize_parts(*args))
+        return dict(canonical_parts[-1])
+
+    monkeypatch.setattr(CadService, "canonicalize_parts", staticmethod(record_canonical_parts))
+    pooled = Project(options=pooled_options)
+    CadService.read_cq_assembly(make_nested_assembly(shared_shape=False), pooled, CadService.read_index(tmp_path, CadService.read_project(tmp_path), options))
+    assert len(canonical_parts[0]) == 3 and all(canonical_part.part_group is None for canonical_part in canonical_parts[0].values())
+    for path, part_ref in project.part_refs.items():
+        assert np.allclose(pooled.part_refs[path].location.to_matrix(), part_ref.location.to_matrix(), atol=1e-9)
+
+    # the cache is ignored when the options or the catalog changed
+    assert CadService.read_index(tmp_path, None, ProjectOptions()).aligned_refs == {}
+    catalog_path = tmp_path / "inventory" / "catalog.json"
+    catalog_path.write_text(catalog_path.read_text() + "\n")
+    assert CadService.read_index(tmp_path, None, options).aligned_refs == {}
+
+
+def test_parts_are_loaded_lazily(tmp_path, nested_assembly_with_pin):
+    from orion_cli.services.cad_service import CadService, Project
+
+    project = Project()
+    cq_assembly = nested_assembly_with_pin
+    CadService.read_cq_assembly(cq_assembly, project)
+    CadService.write_project(tmp_path, project)
+
+    parts = CadService.read_project(tmp_path).inventory.parts
+    checksums = list(parts)
+    assert len(checksums) == 2 and not any(parts.is_loaded(checksum) for checksum in checksums)
+    assert parts[checksums[0]].isValid() and parts.is_loaded(checksums[0])
+
+    # bounded parts are unloaded least recently used first and reloaded from their files
+    parts.max_loaded = 1
+    volume = parts[checksums[1]].Volume()
+    assert parts.is_loaded(checksums[1]) and not parts.is_loaded(checksums[0])
+    parts.load()
+    assert sum(parts.is_loaded(checksum) for checksum in checksums) == 1
+    assert np.isclose(parts[checksums[1]].Volume(), volume)
+
+
+@pytest.mark.parametrize("part_format,compress_parts", [("text", True), ("binary", False), ("binary", True)])
+def test_part_formats_round_trip(tmp_path, part_format, compress_parts):
+    from orion_cli.helpers.cad_helper import CadHelper
+    from orion_cli.services.cad_service import CadService, ProjectOptions
+
+    project_path, _ = create_step_project(tmp_path, make_nested_assembly(), ProjectOptions())
+    parts = CadService.read_project(project_path).inventory.parts
+    volumes = {checksum: parts[checksum].Volume() for checksum in parts}
+
+    options = ProjectOptions(part_format=part_format, compress_parts=compress_parts)
+    CadService.migrate_parts(project_path, options)
+    part_files = list((project_path / "inventory" / "parts").iterdir())
+    assert part_files and all(CadHelper.get_brep_format(file_path) == (part_format == "binary", compress_parts) for file_path in part_files)
+
+    parts = CadService.read_project(project_path).inventory.parts
+    assert {checksum: parts[checksum].Volume() for checksum in parts} == pytest.approx(volumes)
+    assert all(CadHelper.get_part_checksum(parts[checksum]) == checksum for checksum in parts)
+
+
+def test_parallel_assets_match_serial(tmp_path, nested_assembly_with_pin):
+    from orion_cli.services.cad_service import CadService, Project
+
+    project = Project()
+    cq_assembly = nested_assembly_with_pin
+    CadService.read_cq_assembly(cq_assembly, project)
+
+    assets = {}
+    for workers in [1, 2]:
+        project_path = tmp_path / f"workers_{workers}"
+        project.options.workers = workers
+        CadService.write_project(project_path, project)
+        # parts that are not loaded are rendered from their files
+        CadService.write_assets(project_path, CadService.read_project(project_path))
+        assets[workers] = {file_path.name: file_path.read_bytes() for file_path in (project_path / "assets").iterdir()}
+    assert len(assets[1]) == 3
+    assert assets[2] == assets[1]
+
+
+def test_display_scene_instances_parts(tmp_path, monkeypatch, nested_assembly_with_pin):
+    import base64
+    from orion_cli.helpers.cad_helper import CadHelper
+    from orion_cli.services.cad_service import CadService, Project
+
+    tesselated = []
+    monkeypatch.setattr(CadHelper, "tesselate_shape", staticmethod(lambda shape, *args: tesselated.append(shape) or cq_tesselate_shape(shape, *args)))
+    cq_assembly = nested_assembly_with_pin
+    project = Project()
+    CadService.read_cq_assembly(cq_assembly, project)
+
+    scene = CadService.get_display_scene(project, tmp_path, lod=False)
+    # each part is tessellated once however often it is placed
+    assert len(tesselated) == len(scene["meshes"]) == 2
+    assert sorted(len(base64.b64decode(group["matrices"])) // 64 for group in scene["groups"]) == [1, 3]
+    assert [group["color"] for group in scene["groups"] if group["color"][1] == 0] == [pytest.approx((1, 0, 0), abs=0.01)]
+
+    expected_bounds = sorted(bounds.tolist() for bounds in get_world_bounds(cq_assembly).values())
+    bounds = []
+    for group in scene["groups"]:
+        vertices = np.frombuffer(base64.b64decode(scene["meshes"][group["mesh"]]["vertices"]), dtype=np.float32).reshape(-1, 3)
+        # column major instance matrices
+        matrices = np.frombuffer(base64.b64decode(group["matrices"]), dtype=np.float32).reshape(-1, 4, 4).transpose(0, 2, 1)
+        for matrix in matrices:
+            world_vertices = vertices @ matrix[:3, :3].T + matrix[:3, 3]
+            bounds.append([world_vertices.min(axis=0).tolist(), world_vertices.max(axis=0).tolist()])
+    # the tessellated cylinder lies slightly inside its exact bounding box
+    assert np.allclose(sorted(bounds), expected_bounds, atol=0.01)
+
+    # the meshes are read from the tessellation store
+    tesselated.clear()
+    assert CadService.get_display_scene(project, tmp_path, lod=False) == scene
+    assert tesselated == []
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="workers must inherit the patched mesher")
+def test_parallel_tessellation_matches_serial(tmp_path, monkeypatch):
+    import cadquery as cq
+    from orion_cli.helpers import cad_helper
+    from orion_cli.helpers.cad_helper import CadHelper, TessellationStore
+
+    # forked workers inherit the patched mesher, spawned ones would import the real one
+    monkeypatch.setattr(CadHelper, "tesselate_shape", staticmethod(cq_tesselate_shape))
+    monkeypatch.setattr(cad_helper, "ProcessPoolExecutor", functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("fork")))
+    cylinder_path = tmp_path / "cylinder.brep"
+    CadHelper.export_brep(cq.Workplane().cylinder(4, 1).val().wrapped, str(cylinder_path), binary=True)
+    shapes = {"box": cq.Workplane().box(1, 2, 3).val(), "cylinder": cylinder_path}
+
+    serial = CadHelper.tesselate_shapes(shapes)
+    store = TessellationStore(tmp_path / "store")
+    for parallel in [CadHelper.tesselate_shapes(shapes, workers=2), CadHelper.tesselate_shapes(shapes, store, workers=2)]:
+        assert parallel.keys() == serial.keys()
+        for key, mesh in serial.items():
+            assert all(np.array_equal(parallel[key][name], array) for name, array in mesh.items()), key
+    assert set(store) == set(shapes)